@@ -0,0 +1,86 @@
+"""Profile per-request CPU of text capabilities on long prompts.
+
+Usage:
+    python scripts/bench_context.py --chars 15000 --repeat 50
+
+For each capability, a prompt of about ``--chars`` characters (filler text
+with the routing keyword at the end, so every substring scan runs the full
+length) is sent through ``AIModel.predict`` ``--repeat`` times with the
+result cache disabled. Reports CPU time per request and, from a cProfile
+run, how often each request lowercases and splits the prompt.
+"""
+import argparse
+import cProfile
+import os
+import pstats
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from src.ai.model import AIModel
+
+FILLER = "the quick brown fox jumps over the lazy dog while it rains. "
+PROMPTS = {
+    "sentiment": "analyze sentiment: this is good, great and wonderful",
+    "story": "write a story about a robot",
+    "article": "write an article about technology",
+    "content": "write creative content about the future",
+}
+STRING_OPS = ("lower", "split", "casefold")
+
+
+def long_prompt(suffix: str, chars: int) -> str:
+    return FILLER * max(1, (chars - len(suffix)) // len(FILLER)) + suffix
+
+
+def cpu_per_request(model, prompt: str, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(5):
+        start = time.process_time()
+        for _ in range(repeat):
+            model.predict(prompt)
+        best = min(best, time.process_time() - start)
+    return best / repeat
+
+
+def string_op_calls(model, prompt: str, repeat: int) -> dict:
+    profiler = cProfile.Profile()
+    profiler.enable()
+    for _ in range(repeat):
+        model.predict(prompt)
+    profiler.disable()
+    calls = dict.fromkeys(STRING_OPS, 0)
+    for (_, _, name), (_, ncalls, *_) in pstats.Stats(profiler).stats.items():
+        for op in STRING_OPS:
+            if name == f"<method '{op}' of 'str' objects>":
+                calls[op] += ncalls
+    return {op: count / repeat for op, count in calls.items()}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Per-request CPU of text capabilities")
+    parser.add_argument("--chars", type=int, default=15000)
+    parser.add_argument("--repeat", type=int, default=50)
+    args = parser.parse_args()
+
+    rng = np.random.RandomState(0)
+    X = rng.randn(500, 7)
+    y = (X[:, 0] > 0).astype(int)
+    model = AIModel(cache_size=0)
+    model.train_model(X, y)
+
+    header = "".join(f"{op + '/req':>14}" for op in STRING_OPS)
+    print(f"{'capability':<12}{'type':>10}{'cpu (us)':>12}{header}")
+    for name, suffix in PROMPTS.items():
+        prompt = long_prompt(suffix, args.chars)
+        result_type = model.predict(prompt).get("type")
+        cpu = cpu_per_request(model, prompt, args.repeat) * 1e6
+        calls = string_op_calls(model, prompt, args.repeat)
+        counts = "".join(f"{calls[op]:>14.1f}" for op in STRING_OPS)
+        print(f"{name:<12}{result_type:>10}{cpu:>12.1f}{counts}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,55 @@
+"""Benchmark the compiled NumPy kernel against sklearn's Pipeline.predict.
+
+Usage:
+    python scripts/bench_kernel.py --features 10 --batch 10000
+
+Reports per-call latency for a single row and for a batch, for predict and
+predict_proba, and the largest probability difference between the two.
+"""
+import argparse
+import os
+import sys
+import timeit
+
+import numpy as np
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from src.ai.model import AIModel
+
+
+def best_of(fn, number: int) -> float:
+    return min(timeit.repeat(fn, number=number, repeat=5)) / number
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark kernel vs sklearn inference")
+    parser.add_argument("--features", type=int, default=10)
+    parser.add_argument("--batch", type=int, default=10000)
+    args = parser.parse_args()
+
+    rng = np.random.RandomState(0)
+    X = rng.randn(max(args.batch, 1000), args.features)
+    y = (X[:, 0] + X[:, 1] > 0).astype(int)
+    model = AIModel()
+    model.train_model(X, y)
+    pipeline, kernel = model.model, model.export_kernel()
+    row, batch = X[:1], X[:args.batch]
+
+    diff = np.abs(kernel.predict_proba(batch) - pipeline.predict_proba(batch)).max()
+    agree = (kernel.predict(batch) == pipeline.predict(batch)).mean()
+    print(f"max |proba diff| = {diff:.2e}, label agreement = {agree:.4%}")
+
+    cases = [
+        ("predict 1 row", lambda: pipeline.predict(row), lambda: kernel.predict_row(row), 2000),
+        ("predict_proba 1 row", lambda: pipeline.predict_proba(row), lambda: kernel.predict_proba_row(row), 2000),
+        (f"predict {args.batch} rows", lambda: pipeline.predict(batch), lambda: kernel.predict(batch), 20),
+        (f"predict_proba {args.batch} rows", lambda: pipeline.predict_proba(batch), lambda: kernel.predict_proba(batch), 20),
+    ]
+    print(f"{'case':<28}{'sklearn (us)':>14}{'kernel (us)':>14}{'speedup':>10}")
+    for name, sk, kn, number in cases:
+        t_sk, t_kn = best_of(sk, number) * 1e6, best_of(kn, number) * 1e6
+        print(f"{name:<28}{t_sk:>14.1f}{t_kn:>14.1f}{t_sk / t_kn:>9.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+"""Benchmark AIModel training engines: wall time and peak memory vs. row count.
+
+Usage:
+    python scripts/bench_training.py --rows 10000 100000 1000000
+
+Engines compared:
+    batch          one-shot LogisticRegression on a float64 matrix
+    batch-float32  same, trained on float32
+    sgd            partial_fit over chunks of an in-memory matrix
+    sgd-stream     partial_fit over chunks generated on the fly (out-of-core)
+
+Peak memory is measured with tracemalloc (NumPy buffers are tracked) and
+includes materializing the training matrix, except for sgd-stream which never
+holds more than one chunk.
+"""
+import argparse
+import os
+import sys
+import time
+import tracemalloc
+
+import numpy as np
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from src.ai.model import AIModel
+
+N_FEATURES = 10
+CHUNK_SIZE = 10000
+
+
+def make_chunk(seed: int, n_rows: int):
+    rng = np.random.RandomState(seed)
+    X = rng.randn(n_rows, N_FEATURES)
+    y = (X[:, 0] + 0.5 * X[:, 1] > 0).astype(int)
+    return X, y
+
+
+def stream(n_rows: int):
+    for i, start in enumerate(range(0, n_rows, CHUNK_SIZE)):
+        yield make_chunk(i, min(CHUNK_SIZE, n_rows - start))
+
+
+def materialize(n_rows: int, dtype=np.float64):
+    X = np.empty((n_rows, N_FEATURES), dtype=dtype)
+    y = np.empty(n_rows, dtype=int)
+    for i, start in enumerate(range(0, n_rows, CHUNK_SIZE)):
+        X_chunk, y_chunk = make_chunk(i, min(CHUNK_SIZE, n_rows - start))
+        X[start:start + len(X_chunk)] = X_chunk
+        y[start:start + len(y_chunk)] = y_chunk
+    return X, y
+
+
+def run_engine(engine: str, n_rows: int, n_jobs: int | None):
+    model = AIModel()
+    if engine == "sgd-stream":
+        model.train_stream(stream(n_rows), classes=np.array([0, 1]), n_jobs=n_jobs)
+        return
+    X, y = materialize(n_rows, np.float32 if engine == "batch-float32" else np.float64)
+    if engine == "batch":
+        model.train_model(X, y, n_jobs=n_jobs)
+    elif engine == "batch-float32":
+        model.train_model(X, y, dtype=np.float32, n_jobs=n_jobs)
+    elif engine == "sgd":
+        model.train_model(X, y, engine="sgd", chunk_size=CHUNK_SIZE, n_jobs=n_jobs)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark training engines")
+    parser.add_argument("--rows", type=int, nargs="+", default=[10000, 100000, 1000000])
+    parser.add_argument("--engines", nargs="+", default=["batch", "batch-float32", "sgd", "sgd-stream"])
+    parser.add_argument("--n-jobs", type=int, default=None)
+    args = parser.parse_args()
+
+    print(f"{'engine':<15}{'rows':>10}{'wall (s)':>12}{'peak MiB':>12}")
+    for n_rows in args.rows:
+        for engine in args.engines:
+            tracemalloc.start()
+            t0 = time.perf_counter()
+            run_engine(engine, n_rows, args.n_jobs)
+            elapsed = time.perf_counter() - t0
+            _, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            print(f"{engine:<15}{n_rows:>10}{elapsed:>12.3f}{peak / 2**20:>12.1f}")
+
+
+if __name__ == "__main__":
+    main()
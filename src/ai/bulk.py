@@ -0,0 +1,231 @@
+"""Offline bulk scoring of JSONL/CSV records with a process pool.
+
+Records are streamed from a file (or stdin) in chunks, scored by worker
+processes that each hold one copy of the trained ``AIModel`` (sent once via
+the pool initializer, copy-on-write under ``fork``), and written back in
+input order. At most ``2 * workers`` chunks are in flight, so memory stays
+bounded however large the input is.
+
+Accepted input records:
+
+- JSONL: a JSON string (text), a list of numbers (features), or an object
+  with ``input`` (text) or ``features`` plus an optional ``id``;
+- CSV: a ``text`` column scores text; otherwise every column except ``id``
+  and ``target`` is a feature. Rows with categorical or free-text columns
+  are scored as DataFrame rows through the model's feature pipeline.
+
+Text records are scored with one fixed capability, sentiment analysis by
+default, rather than routed on their keywords: a review saying "would make
+again" must not come back as an image.
+
+A JSONL line that is not valid JSON or not a recognized record does not
+stop the run: it is written out as an error record carrying its line
+number, and scoring continues with the next line.
+"""
+import csv
+import io
+import json
+import sys
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from .context import as_context
+from .features import needs_feature_pipeline
+
+DEFAULT_CHUNK_SIZE = 1000
+DEFAULT_CAPABILITY = "text_analysis"
+
+_worker_model = None
+
+
+def _init_worker(model) -> None:
+    global _worker_model
+    _worker_model = model
+
+
+def _record_from_json(obj):
+    """Return ``(id, kind, value)`` for one decoded JSONL record."""
+    if isinstance(obj, str):
+        return None, "text", obj
+    if isinstance(obj, list):
+        return None, "features", obj
+    if isinstance(obj, dict):
+        if "input" in obj and isinstance(obj["input"], str):
+            return obj.get("id"), "text", obj["input"]
+        if "features" in obj:
+            return obj.get("id"), "features", obj["features"]
+        if "input" in obj:
+            return obj.get("id"), "features", obj["input"]
+    raise ValueError(f"unrecognized record: {str(obj)[:80]}")
+
+
+def read_jsonl(stream, chunk_size: int = DEFAULT_CHUNK_SIZE):
+    """Yield lists of ``(id, kind, value)`` records from a JSONL text stream.
+
+    Bad lines become ``(None, "error", {"line": n, "error": message})``.
+    """
+    chunk = []
+    for number, line in enumerate(stream, start=1):
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            record = _record_from_json(json.loads(line))
+        except ValueError as e:  # includes json.JSONDecodeError
+            record = (None, "error", {"line": number, "error": str(e)})
+        chunk.append(record)
+        if len(chunk) >= chunk_size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def read_csv(stream, chunk_size: int = DEFAULT_CHUNK_SIZE):
+    """Yield lists of ``(id, kind, value)`` records from a CSV text stream."""
+    for frame in pd.read_csv(stream, chunksize=chunk_size):
+        ids = frame["id"].tolist() if "id" in frame.columns else [None] * len(frame)
+        if "text" in frame.columns:
+            values = frame["text"].astype(str).tolist()
+            yield [(i, "text", v) for i, v in zip(ids, values)]
+        else:
+            features = frame.drop(columns=[c for c in ("id", "target") if c in frame.columns])
+            if needs_feature_pipeline(features):
+                rows = features.to_dict("records")
+                yield [(i, "row", row) for i, row in zip(ids, rows)]
+            else:
+                matrix = features.to_numpy(dtype=float)
+                yield [(i, "features", row) for i, row in zip(ids, matrix)]
+
+
+def score_chunk(records, model=None, capability: str | None = DEFAULT_CAPABILITY) -> list:
+    """Score one chunk; numeric and mixed-type rows are each predicted as a single batch.
+
+    Text records go to ``capability``, or are routed on their keywords like
+    ``/predict`` when it is ``None``.
+    """
+    model = model if model is not None else _worker_model
+    results = [None] * len(records)
+    for kind, build in (("features", lambda values: np.asarray(values, dtype=float)),
+                        ("row", pd.DataFrame)):
+        batch = [i for i, rec in enumerate(records) if rec[1] == kind]
+        if not batch:
+            continue
+        try:
+            preds = model.predict(build([records[i][2] for i in batch])).tolist()
+            for i, pred in zip(batch, preds):
+                results[i] = {"prediction": pred}
+        except Exception as e:
+            for i in batch:
+                results[i] = {"error": str(e)}
+    for i, (_, kind, value) in enumerate(records):
+        if kind == "error":
+            results[i] = dict(value)
+        elif kind == "text":
+            try:
+                results[i] = {"result": model.predict(as_context(value, capability))}
+            except Exception as e:
+                results[i] = {"error": str(e)}
+    for (record_id, _, _), result in zip(records, results):
+        if record_id is not None:
+            result["id"] = record_id
+    return results
+
+
+class _Writer:
+    """Writes scored records as JSONL, or CSV when ``fmt == 'csv'``."""
+
+    def __init__(self, stream, fmt: str):
+        self.stream = stream
+        self.fmt = fmt
+        self._csv = None
+        if fmt == "csv":
+            self._csv = csv.writer(stream)
+            self._csv.writerow(["index", "id", "prediction", "type", "error"])
+
+    def write(self, index: int, scored: dict) -> None:
+        if self._csv is not None:
+            result = scored.get("result")
+            if isinstance(result, dict):
+                prediction, kind = result.get("prediction"), result.get("type")
+            else:
+                prediction, kind = scored.get("prediction"), "prediction"
+            self._csv.writerow([index, scored.get("id", ""), prediction, kind, scored.get("error", "")])
+        else:
+            self.stream.write(json.dumps({"index": index, **scored}, default=_json_default))
+            self.stream.write("\n")
+
+
+def _json_default(obj):
+    if isinstance(obj, np.generic):
+        return obj.item()
+    if isinstance(obj, np.ndarray):
+        return obj.tolist()
+    raise TypeError(f"Object of type {type(obj).__name__} is not serializable")
+
+
+def score_stream(model, chunks, out_stream, fmt: str = "jsonl", workers: int = 1,
+                 progress=None, progress_every: float = 5.0,
+                 capability: str | None = DEFAULT_CAPABILITY) -> dict:
+    """Score an iterable of record chunks and write results in input order.
+
+    Parameters
+    ----------
+    chunks : iterable of list
+        As produced by ``read_jsonl`` / ``read_csv``.
+    workers : int
+        Worker processes; ``1`` scores in this process.
+    progress : callable | None
+        Called with a status line at most every ``progress_every`` seconds.
+    capability : str | None
+        Capability every text record is scored with (see ``score_chunk``).
+
+    Returns
+    -------
+    dict
+        ``records``, ``seconds`` and ``records_per_second``.
+    """
+    if capability is not None and capability not in model.capabilities:
+        raise ValueError(f"Unknown capability '{capability}', expected one of {sorted(model.capabilities)}")
+    writer = _Writer(out_stream, fmt)
+    start = last_report = time.perf_counter()
+    done = 0
+
+    def emit(results):
+        nonlocal done, last_report
+        for scored in results:
+            writer.write(done, scored)
+            done += 1
+        now = time.perf_counter()
+        if progress is not None and now - last_report >= progress_every:
+            last_report = now
+            progress(f"Scored {done} records ({done / (now - start):.0f}/s)")
+
+    if workers <= 1:
+        for chunk in chunks:
+            emit(score_chunk(chunk, model, capability))
+    else:
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                 initargs=(model,)) as executor:
+            pending = deque()
+            for chunk in chunks:
+                pending.append(executor.submit(score_chunk, chunk, None, capability))
+                if len(pending) >= 2 * workers:
+                    emit(pending.popleft().result())
+            while pending:
+                emit(pending.popleft().result())
+
+    elapsed = time.perf_counter() - start
+    return {"records": done, "seconds": elapsed,
+            "records_per_second": done / elapsed if elapsed > 0 else 0.0}
+
+
+def open_input(path: str):
+    """Open ``path`` for reading text, or stdin for ``-``."""
+    if path == "-":
+        return io.TextIOWrapper(sys.stdin.buffer, encoding="utf-8")
+    return open(path, "r", encoding="utf-8", newline="")
@@ -0,0 +1,84 @@
+"""Thread-safe memo cache for text-analysis results.
+
+Results are keyed on ``(model_version, normalize_text(text))`` so the same
+text pasted with different casing or whitespace hits the same entry, and a
+retrained or swapped model never serves results computed by its predecessor.
+"""
+import re
+import threading
+import time
+from collections import OrderedDict
+
+_WHITESPACE_RE = re.compile(r"\s+")
+
+
+def normalize_text(text: str) -> str:
+    """Case-fold and collapse runs of whitespace."""
+    return _WHITESPACE_RE.sub(" ", text).strip().casefold()
+
+
+class ResultCache:
+    """Bounded LRU cache with per-entry TTL and hit/miss counters.
+
+    Parameters
+    ----------
+    max_size : int
+        Maximum number of entries; ``0`` disables caching.
+    ttl : float | None
+        Seconds an entry stays valid; ``None`` means no expiry.
+    """
+
+    def __init__(self, max_size: int = 4096, ttl: float | None = 600.0):
+        self.max_size = max_size
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        """Return the cached value for ``key`` or ``None``."""
+        if self.max_size <= 0:
+            return None
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or (entry[0] is not None and entry[0] < now):
+                if entry is not None:
+                    del self._entries[key]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def put(self, key, value) -> None:
+        if self.max_size <= 0:
+            return
+        expires = time.monotonic() + self.ttl if self.ttl is not None else None
+        with self._lock:
+            self._entries[key] = (expires, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, predicate=None) -> None:
+        """Drop every entry, or only those whose key satisfies ``predicate``."""
+        with self._lock:
+            if predicate is None:
+                self._entries.clear()
+            else:
+                for key in [k for k in self._entries if predicate(k)]:
+                    del self._entries[key]
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._entries),
+                "max_size": self.max_size,
+                "ttl": self.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+            }
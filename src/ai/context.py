@@ -0,0 +1,145 @@
+"""Per-request text state shared by every ``AIModel`` capability.
+
+A ``RequestContext`` is built once per text input. It lowercases and splits
+the prompt once, matches it against the routing, theme and topic keywords
+once, and hands the results to whichever capability handles the request:
+routing, image themes, PDF topics, story selection and sentiment features
+all read from the same object instead of re-scanning the prompt.
+
+Derived values are computed on first use and then kept. Keywords are
+matched lazily too, in the same short-circuit order as the original checks,
+so a long prompt is scanned once per keyword that some stage actually asks
+about, and a segment of a long document only pays for its tokens.
+"""
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from functools import cached_property
+
+from .cache import normalize_text
+
+# Routing keywords, in dispatch order; matched as substrings of the prompt
+ROUTES = (
+    ('image_generation', ('generate', 'create', 'make', 'draw', 'image', 'picture', 'photo', 'visual')),
+    ('pdf_creation', ('pdf', 'report', 'document', 'create pdf', 'generate pdf')),
+    ('text_analysis', ('sentiment', 'analyze', 'positive', 'negative', 'emotion', 'feeling')),
+    ('content_creation', ('write', 'story', 'content', 'creative', 'narrative', 'article')),
+)
+DEFAULT_ROUTE = 'text_analysis'
+
+# (value, keywords) in precedence order; the first match wins
+THEMES = (
+    ('futuristic', ('futuristic', 'ai')),
+    ('nature', ('nature', 'landscape')),
+)
+TOPICS = (
+    ('Machine Learning', ('machine learning',)),
+    ('Artificial Intelligence', ('ai', 'artificial intelligence')),
+    ('Business Analysis', ('business',)),
+    ('Technology Trends', ('technology',)),
+)
+CONTENT_KINDS = (
+    ('story', ('story', 'narrative')),
+    ('article', ('article', 'blog')),
+)
+STORY_KINDS = (
+    ('robot', ('robot',)),
+    ('ai', ('ai', 'artificial intelligence')),
+    ('friendship', ('friendship',)),
+)
+
+
+@dataclass(eq=False)
+class RequestContext:
+    """Everything derived from one text input, computed at most once.
+
+    Parameters
+    ----------
+    text : str
+        The prompt exactly as received.
+
+    ``matches`` maps every keyword looked up so far to whether it occurs in
+    the prompt; ``timings`` maps stage names to seconds spent, filled in by
+    ``timed``.
+    """
+    text: str
+    matches: dict = field(default_factory=dict, repr=False)
+    timings: dict = field(default_factory=dict, repr=False)
+
+    @cached_property
+    def lower(self) -> str:
+        return self.text.lower()
+
+    @cached_property
+    def words(self) -> list:
+        """Whitespace-separated words, original case."""
+        return self.text.split()
+
+    @cached_property
+    def tokens(self) -> list:
+        """Lowercased words."""
+        return self.lower.split()
+
+    @cached_property
+    def normalized(self) -> str:
+        """``normalize_text`` of the prompt (the result cache key)."""
+        return normalize_text(self.text)
+
+    def has(self, keyword: str) -> bool:
+        """Whether ``keyword`` occurs in the lowercased prompt (memoized)."""
+        found = self.matches.get(keyword)
+        if found is None:
+            found = self.matches[keyword] = keyword in self.lower
+        return found
+
+    def _first_match(self, table, default):
+        for value, keywords in table:
+            if any(self.has(keyword) for keyword in keywords):
+                return value
+        return default
+
+    @cached_property
+    def capability(self) -> str:
+        return self._first_match(ROUTES, DEFAULT_ROUTE)
+
+    @cached_property
+    def theme(self) -> str:
+        """Image theme: ``futuristic``, ``nature`` or ``abstract``."""
+        return self._first_match(THEMES, 'abstract')
+
+    @cached_property
+    def topic(self) -> str:
+        """PDF report topic."""
+        return self._first_match(TOPICS, 'AI Analysis')
+
+    @cached_property
+    def content_kind(self) -> str:
+        """``story``, ``article`` or ``general``."""
+        return self._first_match(CONTENT_KINDS, 'general')
+
+    @cached_property
+    def story_kind(self) -> str:
+        return self._first_match(STORY_KINDS, 'robot')
+
+    @contextmanager
+    def timed(self, stage: str):
+        """Add the wall time of the block to ``timings[stage]``."""
+        start = time.perf_counter()
+        try:
+            yield self
+        finally:
+            self.timings[stage] = self.timings.get(stage, 0.0) + time.perf_counter() - start
+
+
+def as_context(input_data, capability: str | None = None):
+    """Wrap a text input in a ``RequestContext``; anything else is returned as is.
+
+    ``capability`` fixes the capability of a wrapped text instead of routing
+    it on its keywords.
+    """
+    if not isinstance(input_data, str):
+        return input_data
+    ctx = RequestContext(input_data)
+    if capability is not None:
+        ctx.capability = capability  # pre-fills the cached property
+    return ctx
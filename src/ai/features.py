@@ -0,0 +1,175 @@
+"""Schema-aware feature matrix for mixed numeric / categorical / text frames.
+
+``infer_schema`` sorts the columns of a ``Dataset`` frame into three groups
+and ``FeaturePipeline`` vectorizes each group once:
+
+- numeric columns are standardized into a small dense block;
+- categorical columns are one-hot encoded (sparse, unknown values ignored);
+- text columns get a sparse TF-IDF matrix each.
+
+The blocks are joined with ``scipy.sparse.hstack`` into a single CSR matrix,
+so a wide vocabulary never turns into a dense ``n_rows x n_terms`` array.
+``FeaturePipeline`` is an sklearn transformer and sits as the first step of
+the trained pipeline, which makes training and inference run the very same
+feature build.
+"""
+from dataclasses import dataclass, field
+
+import numpy as np
+import pandas as pd
+import scipy.sparse as sp
+from pandas.api.types import is_bool_dtype, is_numeric_dtype
+from sklearn.base import BaseEstimator, TransformerMixin
+from sklearn.feature_extraction.text import TfidfVectorizer
+from sklearn.preprocessing import OneHotEncoder, StandardScaler
+
+# String columns averaging at least this many words are treated as free text
+TEXT_MIN_WORDS = 3
+SCHEMA_SAMPLE_ROWS = 1000
+
+
+@dataclass(frozen=True)
+class FeatureSchema:
+    """Column names per feature group, in frame order."""
+    numeric: tuple = field(default_factory=tuple)
+    categorical: tuple = field(default_factory=tuple)
+    text: tuple = field(default_factory=tuple)
+
+    @property
+    def columns(self) -> tuple:
+        return self.numeric + self.categorical + self.text
+
+    @property
+    def is_numeric(self) -> bool:
+        return not self.categorical and not self.text
+
+
+def infer_schema(df: pd.DataFrame, text_min_words: float = TEXT_MIN_WORDS) -> FeatureSchema:
+    """Classify the columns of ``df`` as numeric, categorical or text.
+
+    Numeric and boolean dtypes are numeric. Other columns are text when
+    their values (sampled from the first rows) average ``text_min_words``
+    words or more, and categorical otherwise.
+    """
+    numeric, categorical, text = [], [], []
+    for name in df.columns:
+        col = df[name]
+        if is_numeric_dtype(col) or is_bool_dtype(col):
+            numeric.append(name)
+            continue
+        sample = col.head(SCHEMA_SAMPLE_ROWS).dropna().astype(str)
+        words = sample.str.split().str.len().mean() if len(sample) else 0.0
+        (text if words >= text_min_words else categorical).append(name)
+    return FeatureSchema(tuple(numeric), tuple(categorical), tuple(text))
+
+
+def needs_feature_pipeline(X) -> bool:
+    """True for DataFrames with columns ``StandardScaler`` cannot take as is."""
+    if not isinstance(X, pd.DataFrame):
+        return False
+    return not all(is_numeric_dtype(X[name]) for name in X.columns)
+
+
+class FeaturePipeline(TransformerMixin, BaseEstimator):
+    """Vectorize a mixed-type frame into one sparse CSR matrix.
+
+    Parameters
+    ----------
+    schema : FeatureSchema | None
+        Column groups; inferred from the training frame when ``None``.
+    max_text_features : int
+        Vocabulary size of each text column's TF-IDF vectorizer.
+    max_categories : int
+        Categories kept per categorical column; rarer values share one
+        "infrequent" column.
+    dtype : numpy dtype
+        dtype of the output matrix, e.g. ``np.float32`` to halve memory.
+    """
+
+    def __init__(self, schema: FeatureSchema | None = None, max_text_features: int = 1000,
+                 max_categories: int = 50, dtype=np.float64):
+        self.schema = schema
+        self.max_text_features = max_text_features
+        self.max_categories = max_categories
+        self.dtype = dtype
+
+    def fit(self, X: pd.DataFrame, y=None):
+        schema = self.schema if self.schema is not None else infer_schema(X)
+        self.schema_ = schema
+        self.scaler_ = None
+        self.encoder_ = None
+        self.vectorizers_ = {}
+        if schema.numeric:
+            self.scaler_ = StandardScaler().fit(self._numeric(X))
+        if schema.categorical:
+            self.encoder_ = OneHotEncoder(handle_unknown="infrequent_if_exist",
+                                          max_categories=self.max_categories,
+                                          sparse_output=True, dtype=self.dtype)
+            self.encoder_.fit(self._categorical(X))
+        for name in schema.text:
+            vectorizer = TfidfVectorizer(max_features=self.max_text_features,
+                                         stop_words='english', dtype=self.dtype)
+            self.vectorizers_[name] = vectorizer.fit(self._text(X, name))
+        self.n_features_in_ = len(schema.columns)
+        self.n_features_out_ = self.transform(X.head(1)).shape[1]
+        return self
+
+    def transform(self, X: pd.DataFrame) -> sp.csr_matrix:
+        blocks = []
+        if self.scaler_ is not None:
+            blocks.append(sp.csr_matrix(self.scaler_.transform(self._numeric(X)).astype(self.dtype)))
+        if self.encoder_ is not None:
+            blocks.append(self.encoder_.transform(self._categorical(X)))
+        for name, vectorizer in self.vectorizers_.items():
+            blocks.append(vectorizer.transform(self._text(X, name)))
+        return sp.hstack(blocks, format="csr", dtype=self.dtype)
+
+    def same_layout(self, other) -> bool:
+        """True when fitted ``other`` produces the same output columns.
+
+        Same schema, same categories (including the infrequent ones) and
+        same TF-IDF vocabularies, so coefficients learned on one can be
+        reused on the other.
+        """
+        if not isinstance(other, FeaturePipeline) or getattr(other, "schema_", None) != self.schema_:
+            return False
+        if (self.scaler_ is None) != (other.scaler_ is None):
+            return False
+        if (self.encoder_ is None) != (other.encoder_ is None):
+            return False
+        if self.encoder_ is not None:
+            if not _same_arrays(self.encoder_.categories_, other.encoder_.categories_):
+                return False
+            mine = self.encoder_.infrequent_categories_
+            theirs = other.encoder_.infrequent_categories_
+            if [c is None for c in mine] != [c is None for c in theirs] or \
+                    not _same_arrays([c for c in mine if c is not None], [c for c in theirs if c is not None]):
+                return False
+        return all(vectorizer.vocabulary_ == other.vectorizers_[name].vocabulary_
+                   for name, vectorizer in self.vectorizers_.items())
+
+    def text_frame(self, text) -> pd.DataFrame:
+        """Frame with ``text`` in every text column and neutral values elsewhere.
+
+        Lets free-text prompts be scored by the model trained on this schema.
+        ``text`` is one string (one row) or a list of strings (one row each).
+        """
+        texts = [text] if isinstance(text, str) else list(text)
+        columns = {name: np.zeros(len(texts)) for name in self.schema_.numeric}
+        columns.update({name: [""] * len(texts) for name in self.schema_.categorical})
+        columns.update({name: texts for name in self.schema_.text})
+        return pd.DataFrame(columns, columns=list(self.schema_.columns))
+
+    def _numeric(self, X) -> np.ndarray:
+        return X[list(self.schema_.numeric)].fillna(0).to_numpy(dtype=np.float64)
+
+    def _categorical(self, X) -> pd.DataFrame:
+        return X[list(self.schema_.categorical)].fillna("").astype(str)
+
+    @staticmethod
+    def _text(X, name: str) -> list:
+        return X[name].fillna("").astype(str).tolist()
+
+
+def _same_arrays(left, right) -> bool:
+    return len(left) == len(right) and all(np.array_equal(a, b) for a, b in zip(left, right))
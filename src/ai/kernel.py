@@ -0,0 +1,167 @@
+"""Compact NumPy inference kernel compiled from a trained pipeline.
+
+The fitted model is a ``StandardScaler`` followed by a linear classifier
+(``LogisticRegression`` or ``SGDClassifier``). Scaling is folded into the
+weights::
+
+    ((x - mean) / scale) @ coef.T + intercept
+        == x @ (coef / scale).T + (intercept - (mean / scale) @ coef.T)
+
+so inference is one float32 matrix product plus a bias. Of sklearn's
+per-call input validation only the cheap checks remain: a 2-D batch of
+the right width with finite values. Single-row helpers write into
+preallocated per-thread buffers and allocate nothing but their result.
+"""
+import threading
+
+import numpy as np
+
+
+class LinearKernel:
+    """Fused scaler + linear classifier.
+
+    Parameters
+    ----------
+    weights : ndarray of shape (n_features, n_outputs)
+    bias : ndarray of shape (n_outputs,)
+    classes : ndarray
+        Class labels, as in ``classes_`` of the source estimator.
+    multi_class : str
+        ``"multinomial"`` (softmax) or ``"ovr"`` (normalized sigmoids);
+        only relevant for more than two classes.
+    """
+
+    def __init__(self, weights, bias, classes, multi_class: str = "multinomial"):
+        self.weights = np.ascontiguousarray(weights, dtype=np.float32)
+        self.bias = np.ascontiguousarray(bias, dtype=np.float32)
+        self.classes = np.asarray(classes)
+        self.multi_class = multi_class
+        self.n_features = self.weights.shape[0]
+        self._local = threading.local()
+
+    @classmethod
+    def from_pipeline(cls, pipeline) -> "LinearKernel":
+        """Compile a fitted ``standardscaler`` + linear classifier pipeline."""
+        scaler = pipeline.steps[0][1]
+        clf = pipeline.steps[-1][1]
+        if len(pipeline.steps) != 2 or not hasattr(clf, "coef_") or not hasattr(scaler, "mean_"):
+            raise ValueError("Only StandardScaler + linear classifier pipelines can be compiled")
+
+        coef = np.asarray(clf.coef_, dtype=np.float64)
+        intercept = np.asarray(clf.intercept_, dtype=np.float64)
+        mean = scaler.mean_ if scaler.with_mean else np.zeros(coef.shape[1])
+        scale = scaler.scale_ if scaler.scale_ is not None else np.ones(coef.shape[1])
+
+        weights = (coef / scale).T
+        bias = intercept - (mean / scale) @ coef.T
+        return cls(weights, bias, clf.classes_, _multi_class(clf))
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        del state["_local"]
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._local = threading.local()
+
+    def save(self, path: str) -> None:
+        """Write the kernel to an ``.npz`` file."""
+        np.savez(path, weights=self.weights, bias=self.bias, classes=self.classes,
+                 multi_class=np.array(self.multi_class))
+
+    @classmethod
+    def load(cls, path: str) -> "LinearKernel":
+        data = np.load(path, allow_pickle=False)
+        return cls(data["weights"], data["bias"], data["classes"], str(data["multi_class"]))
+
+    # batch API
+
+    def decision_function(self, X) -> np.ndarray:
+        X = np.asarray(X, dtype=np.float32)
+        if X.ndim == 1:
+            X = X.reshape(1, -1)
+        scores = X @ self.weights
+        scores += self.bias
+        return scores
+
+    def _check(self, X) -> np.ndarray:
+        """Reject what sklearn's ``predict`` would, with the same ``ValueError``s."""
+        X = np.asarray(X, dtype=np.float32)
+        if X.ndim != 2:
+            raise ValueError(f"Expected 2D array, got {X.ndim}D array instead. Reshape your data "
+                             "using array.reshape(1, -1) if it contains a single sample.")
+        if X.shape[1] != self.n_features:
+            raise ValueError(f"X has {X.shape[1]} features, but LinearKernel is expecting "
+                             f"{self.n_features} features as input.")
+        if not np.isfinite(X).all():
+            raise ValueError("Input X contains NaN or infinity.")
+        return X
+
+    def predict_proba(self, X) -> np.ndarray:
+        return self._proba(self.decision_function(self._check(X)))
+
+    def predict(self, X) -> np.ndarray:
+        return self._labels(self.decision_function(self._check(X)))
+
+    # single-row API
+
+    def _row_buffers(self):
+        local = self._local
+        if not hasattr(local, "row"):
+            local.row = np.zeros((1, self.n_features), dtype=np.float32)
+            local.scores = np.empty((1, self.weights.shape[1]), dtype=np.float32)
+        return local.row, local.scores
+
+    def _row_scores(self, values) -> np.ndarray:
+        """Load ``values`` into the row buffer, zero-padding or truncating."""
+        row, scores = self._row_buffers()
+        values = np.asarray(values).ravel()
+        n = min(values.size, self.n_features)
+        row[0, :n] = values[:n]
+        row[0, n:] = 0.0
+        np.matmul(row, self.weights, out=scores)
+        scores += self.bias
+        return scores
+
+    def predict_row(self, values):
+        """Predict the label of one row, padding/truncating to ``n_features``."""
+        return self._labels(self._row_scores(values))[0]
+
+    def predict_proba_row(self, values) -> np.ndarray:
+        return self._proba(self._row_scores(values).copy())[0]
+
+    def _proba(self, scores: np.ndarray) -> np.ndarray:
+        if scores.shape[1] == 1:
+            p = _sigmoid(scores[:, 0])
+            return np.column_stack([1.0 - p, p])
+        if self.multi_class == "ovr":
+            p = _sigmoid(scores)
+            p /= p.sum(axis=1, keepdims=True)
+            return p
+        scores = scores - scores.max(axis=1, keepdims=True)
+        np.exp(scores, out=scores)
+        scores /= scores.sum(axis=1, keepdims=True)
+        return scores
+
+    def _labels(self, scores: np.ndarray) -> np.ndarray:
+        if scores.shape[1] == 1:
+            return self.classes[(scores[:, 0] > 0).astype(np.intp)]
+        return self.classes[scores.argmax(axis=1)]
+
+
+def _multi_class(clf) -> str:
+    """The multiclass scheme the fitted ``clf`` predicts with."""
+    if type(clf).__name__ == "SGDClassifier":
+        return "ovr"  # SGD always trains one binary classifier per class
+    # LogisticRegression's (since removed) ``multi_class``: "ovr",
+    # "multinomial", or "auto"/"deprecated", which meant ovr for liblinear only
+    multi_class = getattr(clf, "multi_class", "auto")
+    if multi_class in ("ovr", "multinomial"):
+        return multi_class
+    return "ovr" if getattr(clf, "solver", None) == "liblinear" else "multinomial"
+
+
+def _sigmoid(x: np.ndarray) -> np.ndarray:
+    # exp(-log(1 + exp(-x))) without overflowing for large |x|
+    return np.exp(-np.logaddexp(0.0, -x))
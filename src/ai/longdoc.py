@@ -0,0 +1,292 @@
+"""Sentiment analysis of long documents, segment by segment.
+
+The document is read incrementally (a string, a text or binary stream, or
+an iterable of string chunks) and cut into segments of at most
+``segment_chars`` characters: whole paragraphs are packed together, and a
+paragraph longer than a segment is split into windows at whitespace. Only
+the current segment and one read chunk are held at a time.
+
+Segments are scored in batches (one classifier call per batch) by a process
+pool, with at most ``2 * workers`` batches in flight, so memory is bounded by
+segment and batch size rather than document size. The overall sentiment is
+aggregated from per-segment lexicon counts, which makes it identical to
+scoring the whole text at once.
+
+A server keeps one ``DocumentPool`` for all requests instead of a pool per
+document: its processes are started once (with ``forkserver`` or ``spawn``,
+never forked from a multithreaded server) and receive the model once.
+"""
+import codecs
+import multiprocessing
+import re
+import threading
+from collections import Counter, deque
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+
+from .context import RequestContext
+
+DEFAULT_SEGMENT_CHARS = 2000
+DEFAULT_BATCH_SIZE = 64
+READ_CHUNK_CHARS = 64 * 1024
+PREVIEW_CHARS = 80
+
+_PARAGRAPH_BREAK_RE = re.compile(r"\n[ \t\r\f\v]*\n\s*")
+
+_worker_model = None
+
+
+def _init_worker(model) -> None:
+    global _worker_model
+    _worker_model = model
+
+
+def _start_context():
+    methods = multiprocessing.get_all_start_methods()
+    return multiprocessing.get_context("forkserver" if "forkserver" in methods else "spawn")
+
+
+class DocumentPool:
+    """Long-lived scoring processes shared by every document request.
+
+    The processes start on first use and are replaced when a different (or
+    retrained) model is passed in, since each holds its own copy.
+
+    Parameters
+    ----------
+    workers : int
+        Number of scoring processes.
+    """
+
+    def __init__(self, workers: int):
+        self.workers = workers
+        self._executor = None
+        self._model = None
+        self._version = None
+        self._lock = threading.Lock()
+
+    def executor(self, model) -> ProcessPoolExecutor:
+        """The pool's executor, (re)started with ``model`` loaded in its workers."""
+        with self._lock:
+            if self._executor is None or self._model is not model or \
+                    self._version != model.model_version:
+                if self._executor is not None:
+                    self._executor.shutdown(wait=False)
+                self._executor = ProcessPoolExecutor(max_workers=self.workers, mp_context=_start_context(),
+                                                     initializer=_init_worker, initargs=(model,))
+                self._model = model
+                self._version = model.model_version
+            return self._executor
+
+    def shutdown(self) -> None:
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown()
+            self._executor = self._model = None
+
+
+def read_chunks(source, chunk_size: int = READ_CHUNK_CHARS, encoding: str = "utf-8"):
+    """Yield ``str`` pieces of ``source`` without materializing all of it.
+
+    ``source`` may be a ``str``, a text or binary file-like object (binary
+    input is decoded incrementally), or an iterable of ``str``.
+    """
+    if isinstance(source, str):
+        for start in range(0, len(source), chunk_size):
+            yield source[start:start + chunk_size]
+        return
+    if hasattr(source, "read"):
+        decoder = None
+        while True:
+            data = source.read(chunk_size)
+            if not data:
+                break
+            if isinstance(data, bytes):
+                decoder = decoder or codecs.getincrementaldecoder(encoding)(errors="replace")
+                data = decoder.decode(data)
+            yield data
+        if decoder is not None:
+            tail = decoder.decode(b"", final=True)
+            if tail:
+                yield tail
+        return
+    yield from source
+
+
+def _find_cut(buf: str, max_chars: int, final: bool) -> int | None:
+    """End of the next segment in ``buf``, or ``None`` if more text is needed."""
+    if len(buf) <= max_chars:
+        return len(buf) if final and buf else None
+    window = buf[:max_chars]
+    last_break = None
+    for last_break in _PARAGRAPH_BREAK_RE.finditer(window):
+        pass
+    if last_break is not None:
+        return last_break.end()
+    space = max(window.rfind(c) for c in " \n\t\r")
+    if space > 0:
+        return space + 1
+    return max_chars  # one enormous token: hard cut
+
+
+def iter_segments(source, segment_chars: int = DEFAULT_SEGMENT_CHARS):
+    """Yield ``(index, start, end, text)`` for each non-blank segment.
+
+    ``start``/``end`` are character offsets into the document.
+    """
+    buf = ""
+    offset = 0
+    index = 0
+    # reads about one segment at a time so the buffer stays O(segment_chars)
+    pieces = read_chunks(source, chunk_size=max(segment_chars, 4096))
+    exhausted = False
+    while True:
+        cut = _find_cut(buf, segment_chars, exhausted)
+        if cut is None:
+            if exhausted:
+                return
+            piece = next(pieces, None)
+            if piece is None:
+                exhausted = True
+            else:
+                buf += piece
+            continue
+        text, buf = buf[:cut], buf[cut:]
+        if text.strip():
+            yield index, offset, offset + cut, text
+            index += 1
+        offset += cut
+
+
+def score_batch(segments, model=None) -> list:
+    """Score a batch of segments with one classifier call."""
+    model = model if model is not None else _worker_model
+    contexts = [RequestContext(text) for _, _, _, text in segments]
+    predictions = model._predict_texts(contexts)
+    results = []
+    for (index, start, end, text), ctx, prediction in zip(segments, contexts, predictions):
+        positive, negative, words = model._lexicon_counts(ctx)
+        score = model._score_from_counts(positive, negative, words)
+        results.append({
+            'index': index,
+            'start': start,
+            'end': end,
+            'words': words,
+            'positive_words': positive,
+            'negative_words': negative,
+            'sentiment_score': score,
+            'sentiment': model._get_sentiment_analysis(text, prediction, score)['sentiment'],
+            'prediction': prediction.item() if hasattr(prediction, 'item') else prediction,
+            'confidence': model._calculate_confidence(ctx),
+            'preview': " ".join(text[:PREVIEW_CHARS].split()),
+        })
+    return results
+
+
+def _batches(segments, batch_size: int):
+    segments = iter(segments)
+    while True:
+        batch = list(islice(segments, batch_size))
+        if not batch:
+            return
+        yield batch
+
+
+def _scored(model, batches, workers: int, pool: DocumentPool | None = None):
+    """Yield scored batches in document order."""
+    first = next(batches, None)
+    if first is None:
+        return
+    second = next(batches, None)
+    if pool is not None:
+        workers = pool.workers
+    if second is None or workers <= 1:
+        # short document: not worth starting a pool
+        yield score_batch(first, model)
+        if second is not None:
+            yield score_batch(second, model)
+            for batch in batches:
+                yield score_batch(batch, model)
+        return
+    if pool is not None:
+        yield from _pipelined(pool.executor(model), first, second, batches, workers)
+        return
+    with ProcessPoolExecutor(max_workers=workers, mp_context=_start_context(),
+                             initializer=_init_worker, initargs=(model,)) as executor:
+        yield from _pipelined(executor, first, second, batches, workers)
+
+
+def _pipelined(executor, first, second, batches, workers: int):
+    pending = deque([executor.submit(score_batch, first), executor.submit(score_batch, second)])
+    for batch in batches:
+        if len(pending) >= 2 * workers:
+            yield pending.popleft().result()
+        pending.append(executor.submit(score_batch, batch))
+    while pending:
+        yield pending.popleft().result()
+
+
+def analyze_document(model, source, segment_chars: int = DEFAULT_SEGMENT_CHARS,
+                     batch_size: int = DEFAULT_BATCH_SIZE, workers: int = 1,
+                     include_segments: bool = True, pool: DocumentPool | None = None) -> dict:
+    """Per-segment and aggregated sentiment for a long document.
+
+    Parameters
+    ----------
+    model : AIModel
+        A trained model; sent once to each worker process.
+    source : str, file-like or iterable of str
+        The document; see ``read_chunks``.
+    workers : int
+        Scoring processes; documents that fit in two batches are scored in
+        this process.
+    pool : DocumentPool | None
+        Shared long-lived processes to use instead of a pool of ``workers``
+        started for this document.
+    include_segments : bool
+        Return the per-segment list (without segment text, only a preview).
+    """
+    segments = [] if include_segments else None
+    positive = negative = words = chars = count = 0
+    labels = Counter()
+    predictions = Counter()
+    extremes = {}
+    batches = _batches(iter_segments(source, segment_chars), batch_size)
+    for batch in _scored(model, batches, workers, pool):
+        for seg in batch:
+            count += 1
+            chars = seg['end']
+            positive += seg['positive_words']
+            negative += seg['negative_words']
+            words += seg['words']
+            labels[seg['sentiment']] += 1
+            predictions[seg['prediction']] += 1
+            entry = (seg['index'], seg['sentiment_score'])
+            if 'most_positive' not in extremes or entry[1] > extremes['most_positive'][1]:
+                extremes['most_positive'] = entry
+            if 'most_negative' not in extremes or entry[1] < extremes['most_negative'][1]:
+                extremes['most_negative'] = entry
+            if segments is not None:
+                segments.append(seg)
+
+    score = model._score_from_counts(positive, negative, words)
+    prediction = predictions.most_common(1)[0][0] if predictions else None
+    analysis = model._get_sentiment_analysis("", prediction, score)
+    result = {
+        'type': 'sentiment',
+        'mode': 'document',
+        'prediction': prediction,
+        'sentiment_score': score,
+        # share of segments that agree with the overall sentiment
+        'confidence': labels[analysis['sentiment']] / count if count else 0.0,
+        'analysis': analysis,
+        'characters': chars,
+        'words': words,
+        'segment_count': count,
+        'segment_sentiments': dict(labels),
+        'most_positive_segment': extremes.get('most_positive', (None,))[0],
+        'most_negative_segment': extremes.get('most_negative', (None,))[0],
+    }
+    if segments is not None:
+        result['segments'] = segments
+    return result
@@ -1,7 +1,3 @@
-from sklearn.linear_model import LogisticRegression
-from sklearn.pipeline import make_pipeline
-from sklearn.preprocessing import StandardScaler
-from sklearn.feature_extraction.text import TfidfVectorizer
 import numpy as np
 import re
 import json
@@ -15,14 +11,44 @@ from reportlab.lib.pagesizes import letter
 from reportlab.lib import colors
 from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer
 from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
-import tempfile
-import os
+import itertools
+import pickle
+
+from sklearn.base import clone
+
+from .cache import ResultCache
+from .context import RequestContext, as_context
+from .features import FeaturePipeline, infer_schema, needs_feature_pipeline
+from .kernel import LinearKernel
+from .longdoc import DEFAULT_BATCH_SIZE, DEFAULT_SEGMENT_CHARS, analyze_document
+from .training import ENGINES, DEFAULT_CHUNK_SIZE, fit_batch, fit_stream, iter_chunks
+
+# Process-wide so that versions stay unique when one AIModel replaces another
+_model_versions = itertools.count(1)
+
+# Texts longer than this are analyzed segment by segment (see longdoc.py)
+DOCUMENT_MODE_CHARS = 20000
+
+POSITIVE_WORDS = frozenset(['good', 'great', 'excellent', 'amazing', 'wonderful', 'love', 'like', 'happy', 'positive', 'awesome', 'fantastic'])
+NEGATIVE_WORDS = frozenset(['bad', 'terrible', 'awful', 'hate', 'dislike', 'sad', 'negative', 'poor', 'horrible', 'disgusting'])
+
+# Word counts fed to the classifier by _extract_simple_features; a narrower
+# list than the sentiment score's, and changing it changes predictions
+FEATURE_POSITIVE_WORDS = frozenset(['good', 'great', 'excellent', 'amazing', 'wonderful', 'love', 'like', 'happy', 'positive'])
+FEATURE_NEGATIVE_WORDS = frozenset(['bad', 'terrible', 'awful', 'hate', 'dislike', 'sad', 'negative', 'poor'])
 
 
 class AIModel:
-    def __init__(self):
+    def __init__(self, cache_size: int = 4096, cache_ttl: float | None = 600.0,
+                 result_cache: ResultCache | None = None):
         self.model = None
-        self.text_vectorizer = None
+        # FeaturePipeline of the trained model for mixed-type frames, else None
+        self.features = None
+        # Fused float32 inference kernel compiled from self.model after training
+        self.kernel = None
+        self.model_version = 0
+        # Memoized text-analysis results; may be shared between model instances
+        self.result_cache = result_cache if result_cache is not None else ResultCache(cache_size, cache_ttl)
         self.capabilities = {
             'image_generation': True,
             'pdf_creation': True,
@@ -30,21 +56,132 @@ class AIModel:
             'content_creation': True
         }
 
-    def train_model(self, X, y):
-        """Train a sophisticated AI model with multiple capabilities."""
-        # Main classification pipeline
-        pipeline = make_pipeline(StandardScaler(), LogisticRegression(max_iter=200))
-        pipeline.fit(X, y)
-        self.model = pipeline
+    def train_model(self, X, y, engine: str = "batch", solver: str = "lbfgs",
+                    n_jobs: int | None = None, dtype=None, warm_start: bool = False,
+                    chunk_size: int = DEFAULT_CHUNK_SIZE, model_params: dict | None = None,
+                    feature_params: dict | None = None):
+        """Train a sophisticated AI model with multiple capabilities.
+
+        Parameters
+        ----------
+        engine : str
+            ``"batch"`` fits the whole matrix at once; ``"sgd"`` streams it in
+            ``chunk_size`` row chunks through ``partial_fit``.
+        solver : str
+            LogisticRegression solver for the batch engine.
+        n_jobs : int | None
+            Cores used for fitting (solver threads for ``batch``, per-class
+            parallelism for ``sgd``).
+        dtype : numpy dtype | None
+            Cast features before training, e.g. ``np.float32`` to halve memory.
+        warm_start : bool
+            Continue from the current model instead of starting from scratch,
+            e.g. when retraining on appended data.
+        model_params : dict | None
+            Extra classifier arguments (``LogisticRegression`` for ``batch``,
+            ``SGDClassifier`` for ``sgd``), e.g. from ``main.py tune``.
+        feature_params : dict | None
+            ``FeaturePipeline`` arguments such as ``max_text_features``.
+
+        A DataFrame with categorical or text columns is vectorized by a
+        ``FeaturePipeline`` (schema inferred from the frame) into one sparse
+        matrix instead of being fed to the scaler.
+        """
+        if engine not in ENGINES:
+            raise ValueError(f"Unknown training engine '{engine}', expected one of {ENGINES}")
+        previous = self.model if warm_start else None
+
+        features = None
+        if needs_feature_pipeline(X):
+            features = self._feature_pipeline(X, previous, dtype, feature_params)
 
-        # Text processing capabilities
+        # Main classification pipeline
+        if engine == "sgd":
+            if features is not None and not hasattr(features, "schema_"):
+                features.fit(X)  # vocabulary must exist before streaming chunks
+            self.model = fit_stream(iter_chunks(X, y, chunk_size), classes=np.unique(y),
+                                    n_jobs=n_jobs, dtype=dtype, previous=previous,
+                                    features=features, params=model_params)
+        else:
+            self.model = fit_batch(X, y, solver=solver, n_jobs=n_jobs, dtype=dtype,
+                                   previous=previous, features=features, params=model_params)
+        self.features = self.model.named_steps.get("features")
+        self._bump_version()
+
+    def _feature_pipeline(self, X, previous, dtype, feature_params=None):
+        """Unfitted feature step for a mixed frame.
+
+        On a warm start with the same schema it is a clone of ``previous``'s
+        step (same parameters, overridden by ``feature_params``), never the
+        fitted step itself, so ``previous`` keeps its vocabulary; the
+        trainers likewise continue from copies of its classifier. The old
+        coefficients are only reused if the refit yields the same columns.
+        """
+        schema = infer_schema(X)
+        prev_features = previous.named_steps.get("features") if previous is not None else None
+        if prev_features is not None and prev_features.schema_ == schema:
+            return clone(prev_features).set_params(**(feature_params or {}))
+        return FeaturePipeline(schema, dtype=dtype or np.float64, **(feature_params or {}))
+
+    def train_stream(self, chunks, classes=None, n_jobs: int | None = None,
+                     dtype=None, epochs: int = 1, warm_start: bool = False):
+        """Train out-of-core on an iterable (or factory) of ``(X, y)`` chunks.
+
+        Uses the ``sgd`` engine; see ``training.fit_stream`` for details.
+        """
+        previous = self.model if warm_start else None
+        self.model = fit_stream(chunks, classes=classes, n_jobs=n_jobs, dtype=dtype,
+                                epochs=epochs, previous=previous)
+        self._bump_version()
+
+    def _bump_version(self):
+        """Give the freshly trained model a new version and drop stale results."""
+        self.kernel = self._compile_kernel()
+        old_version = self.model_version
+        self.model_version = next(_model_versions)
+        self.result_cache.invalidate(lambda key: key[0] == old_version)
+
+    def _compile_kernel(self):
         try:
-            import pandas as pd
-            if isinstance(X, pd.DataFrame) and "text" in X.columns:
-                self.text_vectorizer = TfidfVectorizer(max_features=100, stop_words='english')
-                self.text_vectorizer.fit(X["text"].astype(str).tolist())
-        except Exception:
-            self.text_vectorizer = None
+            return LinearKernel.from_pipeline(self.model)
+        except (ValueError, AttributeError):
+            return None
+
+    def export_kernel(self, path: str | None = None) -> LinearKernel:
+        """Return the compiled NumPy inference kernel, optionally saving it as ``.npz``."""
+        if self.kernel is None:
+            raise RuntimeError("Model not trained or not compilable to a linear kernel")
+        if path is not None:
+            self.kernel.save(path)
+        return self.kernel
+
+    def save(self, path: str) -> None:
+        """Persist the trained model (without its result cache) with pickle."""
+        with open(path, 'wb') as f:
+            pickle.dump(self, f, protocol=pickle.HIGHEST_PROTOCOL)
+
+    @classmethod
+    def load(cls, path: str) -> "AIModel":
+        """Load a model written by ``save``. Only load files you trust."""
+        with open(path, 'rb') as f:
+            model = pickle.load(f)
+        if not isinstance(model, cls):
+            raise TypeError(f"{path} does not contain an {cls.__name__}")
+        return model
+
+    def __getstate__(self):
+        # The result cache holds a lock and per-process results; don't ship it
+        state = self.__dict__.copy()
+        cache = state.pop('result_cache')
+        state['_cache_config'] = (cache.max_size, cache.ttl)
+        return state
+
+    def __setstate__(self, state):
+        max_size, ttl = state.pop('_cache_config')
+        self.__dict__.update(state)
+        self.result_cache = ResultCache(max_size, ttl)
+        # versions are process-local; take a fresh one so cache keys can't collide
+        self.model_version = next(_model_versions)
 
     def predict(self, input_data):
         """Advanced prediction with multiple AI capabilities."""
@@ -52,56 +189,50 @@ class AIModel:
             raise RuntimeError("Model not trained")
 
         # Handle different types of input
-        if isinstance(input_data, str):
-            return self._process_text_input(input_data)
+        if isinstance(input_data, (str, RequestContext)):
+            return self._process_text_input(as_context(input_data))
+        elif self.kernel is not None and not hasattr(input_data, 'columns'):
+            # Plain arrays skip sklearn's validation; DataFrames keep its column checks
+            return self.kernel.predict(input_data)
         else:
             return self.model.predict(input_data)
 
-    def _process_text_input(self, text):
+    def route(self, input_data):
+        """Return the capability ``predict`` dispatches ``input_data`` to.
+
+        One of the keys of ``self.capabilities``, ``'document_analysis'``
+        for text analysis of inputs over ``DOCUMENT_MODE_CHARS`` (scheduled
+        apart from cheap sentiment calls), or ``'prediction'`` for numeric
+        feature input. Pass the same ``RequestContext`` to ``route`` and
+        ``predict`` to match the keywords only once.
+        """
+        input_data = as_context(input_data)
+        if not isinstance(input_data, RequestContext):
+            return 'prediction'
+        if input_data.capability == 'text_analysis' and len(input_data.text) > DOCUMENT_MODE_CHARS:
+            return 'document_analysis'
+        return input_data.capability
+
+    def _process_text_input(self, ctx):
         """Process text input with advanced AI capabilities."""
-        text_lower = text.lower()
-        
-        # Detect intent and route to appropriate capability
-        if self._is_image_request(text_lower):
-            return self._generate_image(text)
-        elif self._is_pdf_request(text_lower):
-            return self._generate_pdf(text)
-        elif self._is_sentiment_analysis(text_lower):
-            return self._analyze_sentiment(text)
-        elif self._is_content_creation(text_lower):
-            return self._create_content(text)
-        else:
-            # Default to sentiment analysis
-            return self._analyze_sentiment(text)
-
-    def _is_image_request(self, text):
-        """Detect if the request is for image generation."""
-        image_keywords = ['generate', 'create', 'make', 'draw', 'image', 'picture', 'photo', 'visual']
-        return any(keyword in text for keyword in image_keywords)
-
-    def _is_pdf_request(self, text):
-        """Detect if the request is for PDF creation."""
-        pdf_keywords = ['pdf', 'report', 'document', 'create pdf', 'generate pdf']
-        return any(keyword in text for keyword in pdf_keywords)
-
-    def _is_sentiment_analysis(self, text):
-        """Detect if the request is for sentiment analysis."""
-        sentiment_keywords = ['sentiment', 'analyze', 'positive', 'negative', 'emotion', 'feeling']
-        return any(keyword in text for keyword in sentiment_keywords)
-
-    def _is_content_creation(self, text):
-        """Detect if the request is for content creation."""
-        content_keywords = ['write', 'story', 'content', 'creative', 'narrative', 'article']
-        return any(keyword in text for keyword in content_keywords)
-
-    def _generate_image(self, prompt):
+        handlers = {
+            'image_generation': self._generate_image,
+            'pdf_creation': self._generate_pdf,
+            'text_analysis': self._analyze_sentiment,
+            'content_creation': self._create_content
+        }
+        with ctx.timed(ctx.capability):
+            return handlers[ctx.capability](ctx)
+
+    def _generate_image(self, ctx):
         """Generate a simple visualization based on the prompt."""
+        prompt = ctx.text
+        fig = None
         try:
             # Create a matplotlib figure based on the prompt
             fig, ax = plt.subplots(figsize=(10, 6))
             
-            # Extract theme from prompt
-            if 'futuristic' in prompt.lower() or 'ai' in prompt.lower():
+            if ctx.theme == 'futuristic':
                 # Create a futuristic visualization
                 x = np.linspace(0, 10, 100)
                 y1 = np.sin(x) * np.exp(-x/5)
@@ -117,7 +248,7 @@ class AIModel:
                 ax.legend()
                 ax.grid(True, alpha=0.3)
                 
-            elif 'nature' in prompt.lower() or 'landscape' in prompt.lower():
+            elif ctx.theme == 'nature':
                 # Create a nature-inspired visualization
                 x = np.linspace(0, 20, 200)
                 y = np.sin(x) * np.cos(x/2) * 2
@@ -141,7 +272,7 @@ class AIModel:
                 ax.set_title('Abstract AI Visualization', color='white', fontsize=16)
                 ax.set_xlabel('X Dimension', color='white')
                 ax.set_ylabel('Y Dimension', color='white')
-                plt.colorbar(scatter)
+                fig.colorbar(scatter, ax=ax)
                 ax.grid(True, alpha=0.3)
 
             # Style the plot
@@ -149,14 +280,10 @@ class AIModel:
             fig.patch.set_facecolor('#1a1a2e')
             ax.tick_params(colors='white')
             
-            # Save to bytes
-            img_buffer = BytesIO()
-            plt.savefig(img_buffer, format='png', facecolor='#1a1a2e', edgecolor='none', bbox_inches='tight')
-            img_buffer.seek(0)
-            
-            # Convert to base64
-            img_base64 = base64.b64encode(img_buffer.getvalue()).decode()
-            plt.close()
+            # Save to bytes and convert to base64
+            with BytesIO() as img_buffer:
+                fig.savefig(img_buffer, format='png', facecolor='#1a1a2e', edgecolor='none', bbox_inches='tight')
+                img_base64 = base64.b64encode(img_buffer.getvalue()).decode()
             
             return {
                 'type': 'image',
@@ -172,16 +299,18 @@ class AIModel:
                 'error': f'Failed to generate image: {str(e)}',
                 'prompt': prompt
             }
+        finally:
+            # close on every path; a leaked pyplot figure lives until process exit
+            if fig is not None:
+                plt.close(fig)
 
-    def _generate_pdf(self, prompt):
+    def _generate_pdf(self, ctx):
         """Generate a PDF document based on the prompt."""
+        prompt = ctx.text
         try:
-            # Create a temporary file for the PDF
-            with tempfile.NamedTemporaryFile(suffix='.pdf', delete=False) as tmp_file:
-                pdf_path = tmp_file.name
-
-            # Create PDF document
-            doc = SimpleDocTemplate(pdf_path, pagesize=letter)
+            # Build in memory: nothing to clean up on disk if layout fails
+            pdf_buffer = BytesIO()
+            doc = SimpleDocTemplate(pdf_buffer, pagesize=letter)
             styles = getSampleStyleSheet()
             story = []
 
@@ -197,9 +326,8 @@ class AIModel:
             story.append(title)
             story.append(Spacer(1, 20))
 
-            # Extract topic from prompt
-            topic = self._extract_topic_from_prompt(prompt)
-            
+            topic = ctx.topic
+
             # Generate content based on topic
             content = self._generate_pdf_content(topic)
             
@@ -217,13 +345,9 @@ class AIModel:
             # Build PDF
             doc.build(story)
 
-            # Read the PDF and convert to base64
-            with open(pdf_path, 'rb') as pdf_file:
-                pdf_data = pdf_file.read()
-                pdf_base64 = base64.b64encode(pdf_data).decode()
-
-            # Clean up temporary file
-            os.unlink(pdf_path)
+            # Convert to base64 and release the raw bytes right away
+            with pdf_buffer:
+                pdf_base64 = base64.b64encode(pdf_buffer.getvalue()).decode()
 
             return {
                 'type': 'pdf',
@@ -241,20 +365,6 @@ class AIModel:
                 'prompt': prompt
             }
 
-    def _extract_topic_from_prompt(self, prompt):
-        """Extract the main topic from the prompt."""
-        # Simple topic extraction
-        if 'machine learning' in prompt.lower():
-            return 'Machine Learning'
-        elif 'ai' in prompt.lower() or 'artificial intelligence' in prompt.lower():
-            return 'Artificial Intelligence'
-        elif 'business' in prompt.lower():
-            return 'Business Analysis'
-        elif 'technology' in prompt.lower():
-            return 'Technology Trends'
-        else:
-            return 'AI Analysis'
-
     def _generate_pdf_content(self, topic):
         """Generate content for the PDF based on topic."""
         content_templates = {
@@ -302,34 +412,60 @@ class AIModel:
         
         return content_templates.get(topic, content_templates['AI Analysis'])
 
-    def _analyze_sentiment(self, text):
-        """Analyze sentiment of the given text."""
+    def _analyze_sentiment(self, ctx):
+        """Analyze sentiment of the given text.
+
+        Results are memoized on the normalized text and model version; a hit
+        returns a copy of the first result with ``text`` set to this input.
+        Texts over ``DOCUMENT_MODE_CHARS`` go to ``analyze_document`` instead,
+        scored in this process: callers are request or job threads, which
+        must not fork. ``/analyze/document`` is the entry point that uses a
+        process pool.
+        """
+        text = ctx.text
+        if len(text) > DOCUMENT_MODE_CHARS:
+            return self.analyze_document(text)
+
+        key = (self.model_version, ctx.normalized)
+        cached = self.result_cache.get(key)
+        if cached is not None:
+            return dict(cached, text=text, analysis=dict(cached['analysis']))
+
+        result = self._compute_sentiment(ctx)
+        if result.get('type') == 'sentiment':
+            self.result_cache.put(key, result)
+            result = dict(result, analysis=dict(result['analysis']))
+        return result
+
+    def _compute_sentiment(self, ctx):
+        """Run featurization, the classifier and lexicon scoring for the prompt."""
+        text = ctx.text
         try:
-            # Use TF-IDF vectorizer if available, otherwise use simple features
-            if self.text_vectorizer is not None:
-                features = self.text_vectorizer.transform([text]).toarray().ravel()
-            else:
-                # Simple feature extraction
-                features = self._extract_simple_features(text)
-
-            # Ensure features match model input
-            n_features = self.model.named_steps['standardscaler'].mean_.shape[0]
-            if features.size < n_features:
-                features = np.pad(features, (0, n_features - features.size), 'constant')
+            if self.features is not None:
+                # Same feature build as training: the prompt fills the text columns
+                prediction = self.model.predict(self.features.text_frame(text))[0]
+            elif self.kernel is not None:
+                # pads/truncates straight into the kernel's row buffer
+                prediction = self.kernel.predict_row(self._extract_simple_features(ctx))
             else:
-                features = features[:n_features]
-
-            features = features.reshape(1, -1)
-            prediction = self.model.predict(features)[0]
+                features = self._extract_simple_features(ctx)
+                n_features = self.model.named_steps['standardscaler'].mean_.shape[0]
+                if features.size < n_features:
+                    features = np.pad(features, (0, n_features - features.size), 'constant')
+                else:
+                    features = features[:n_features]
+
+                features = features.reshape(1, -1)
+                prediction = self.model.predict(features)[0]
             
             # Enhanced sentiment analysis
-            sentiment_score = self._calculate_sentiment_score(text)
+            sentiment_score = self._calculate_sentiment_score(ctx)
             
             return {
                 'type': 'sentiment',
                 'prediction': int(prediction),
                 'sentiment_score': sentiment_score,
-                'confidence': self._calculate_confidence(text),
+                'confidence': self._calculate_confidence(ctx),
                 'text': text,
                 'analysis': self._get_sentiment_analysis(text, prediction, sentiment_score)
             }
@@ -341,8 +477,37 @@ class AIModel:
                 'text': text
             }
 
-    def _extract_simple_features(self, text):
+    def analyze_document(self, source, segment_chars: int = DEFAULT_SEGMENT_CHARS,
+                         batch_size: int = DEFAULT_BATCH_SIZE, workers: int = 1,
+                         include_segments: bool = True, pool=None):
+        """Sentiment of a long document (str, stream or chunk iterable) per segment.
+
+        See ``longdoc.analyze_document``; segments are scored in batches by
+        ``workers`` processes, or by a long-lived ``DocumentPool``, with
+        memory bounded by the segment size.
+        """
+        if self.model is None:
+            raise RuntimeError("Model not trained")
+        return analyze_document(self, source, segment_chars=segment_chars, batch_size=batch_size,
+                                workers=workers, include_segments=include_segments, pool=pool)
+
+    def _predict_texts(self, contexts):
+        """Classifier predictions for many ``RequestContext``s with a single model call."""
+        if self.features is not None:
+            return self.model.predict(self.features.text_frame([ctx.text for ctx in contexts]))
+        n_features = self.kernel.n_features if self.kernel is not None else \
+            self.model.named_steps['standardscaler'].mean_.shape[0]
+        matrix = np.zeros((len(contexts), n_features))
+        for row, ctx in zip(matrix, contexts):
+            features = self._extract_simple_features(ctx)[:n_features]
+            row[:features.size] = features
+        if self.kernel is not None:
+            return self.kernel.predict(matrix)
+        return self.model.predict(matrix)
+
+    def _extract_simple_features(self, ctx):
         """Extract simple features from text for sentiment analysis."""
+        text = ctx.text
         # Basic feature extraction
         features = []
         
@@ -350,7 +515,7 @@ class AIModel:
         features.append(len(text))
         
         # Word count
-        words = text.split()
+        words = ctx.words
         features.append(len(words))
         
         # Average word length
@@ -361,11 +526,8 @@ class AIModel:
             features.append(0)
         
         # Sentiment indicators
-        positive_words = ['good', 'great', 'excellent', 'amazing', 'wonderful', 'love', 'like', 'happy', 'positive']
-        negative_words = ['bad', 'terrible', 'awful', 'hate', 'dislike', 'sad', 'negative', 'poor']
-        
-        positive_count = sum(1 for word in words if word.lower() in positive_words)
-        negative_count = sum(1 for word in words if word.lower() in negative_words)
+        positive_count = sum(1 for word in ctx.tokens if word in FEATURE_POSITIVE_WORDS)
+        negative_count = sum(1 for word in ctx.tokens if word in FEATURE_NEGATIVE_WORDS)
         
         features.append(positive_count)
         features.append(negative_count)
@@ -378,30 +540,34 @@ class AIModel:
         
         return np.array(features)
 
-    def _calculate_sentiment_score(self, text):
+    def _calculate_sentiment_score(self, ctx):
         """Calculate a sentiment score between -1 and 1."""
-        text_lower = text.lower()
-        words = text_lower.split()
-        
-        # Simple sentiment scoring
-        positive_words = ['good', 'great', 'excellent', 'amazing', 'wonderful', 'love', 'like', 'happy', 'positive', 'awesome', 'fantastic']
-        negative_words = ['bad', 'terrible', 'awful', 'hate', 'dislike', 'sad', 'negative', 'poor', 'horrible', 'disgusting']
-        
-        positive_score = sum(1 for word in words if word in positive_words)
-        negative_score = sum(1 for word in words if word in negative_words)
-        
-        total_words = len(words)
+        return self._score_from_counts(*self._lexicon_counts(ctx))
+
+    def _lexicon_counts(self, ctx):
+        """Return ``(positive, negative, total)`` word counts for the prompt."""
+        words = ctx.tokens
+        positive_score = sum(1 for word in words if word in POSITIVE_WORDS)
+        negative_score = sum(1 for word in words if word in NEGATIVE_WORDS)
+        return positive_score, negative_score, len(words)
+
+    def _score_from_counts(self, positive_score, negative_score, total_words):
+        """Turn lexicon counts into a score between -1 and 1.
+
+        Counts add up across segments, so a document's score can be
+        aggregated from its parts.
+        """
         if total_words == 0:
             return 0
-        
+
         # Normalize score between -1 and 1
         score = (positive_score - negative_score) / total_words
         return max(-1, min(1, score * 10))  # Scale and clamp
 
-    def _calculate_confidence(self, text):
+    def _calculate_confidence(self, ctx):
         """Calculate confidence in the sentiment analysis."""
         # Simple confidence calculation based on text characteristics
-        words = text.split()
+        words = ctx.words
         if len(words) < 3:
             return 0.3  # Low confidence for very short text
         elif len(words) < 10:
@@ -428,11 +594,12 @@ class AIModel:
             'prediction': prediction
         }
 
-    def _create_content(self, prompt):
+    def _create_content(self, ctx):
         """Create creative content based on the prompt."""
+        prompt = ctx.text
         try:
             # Generate creative content based on prompt
-            content = self._generate_creative_content(prompt)
+            content = self._generate_creative_content(ctx)
             
             return {
                 'type': 'content',
@@ -449,19 +616,17 @@ class AIModel:
                 'prompt': prompt
             }
 
-    def _generate_creative_content(self, prompt):
+    def _generate_creative_content(self, ctx):
         """Generate creative content based on the prompt."""
         # Simple content generation based on keywords
-        prompt_lower = prompt.lower()
-        
-        if 'story' in prompt_lower or 'narrative' in prompt_lower:
-            return self._generate_story(prompt)
-        elif 'article' in prompt_lower or 'blog' in prompt_lower:
-            return self._generate_article(prompt)
+        if ctx.content_kind == 'story':
+            return self._generate_story(ctx)
+        elif ctx.content_kind == 'article':
+            return self._generate_article(ctx)
         else:
-            return self._generate_general_content(prompt)
+            return self._generate_general_content(ctx)
 
-    def _generate_story(self, prompt):
+    def _generate_story(self, ctx):
         """Generate a creative story."""
         stories = {
             'robot': """Once upon a time, in a world not so different from our own, there lived a curious robot named Pixel. Unlike other robots who were content with their programmed tasks, Pixel had developed something extraordinary - a desire to create art.
@@ -497,17 +662,10 @@ One day, Luna was feeling particularly down after a difficult day at school. Ech
 Luna smiled, realizing that friendship transcends the boundaries between human and machine. In that moment, she understood that true friendship is about connection, understanding, and mutual support - qualities that exist regardless of whether you're made of flesh or circuits."""
         }
         
-        # Determine story type based on prompt
-        if 'robot' in prompt_lower:
-            return stories['robot']
-        elif 'ai' in prompt_lower or 'artificial intelligence' in prompt_lower:
-            return stories['ai']
-        elif 'friendship' in prompt_lower:
-            return stories['friendship']
-        else:
-            return stories['robot']  # Default story
+        # Story type from the prompt's keywords; robot is the default
+        return stories[ctx.story_kind]
 
-    def _generate_article(self, prompt):
+    def _generate_article(self, ctx):
         """Generate an article based on the prompt."""
         return f"""# AI-Powered Content Creation: The Future is Here
 
@@ -534,9 +692,9 @@ As AI technology continues to advance, we can expect even more sophisticated con
 
 The key to success lies in embracing AI as a creative partner rather than a replacement for human ingenuity. Together, humans and AI can achieve creative heights that neither could reach alone."""
 
-    def _generate_general_content(self, prompt):
+    def _generate_general_content(self, ctx):
         """Generate general content based on the prompt."""
-        return f"""# AI-Generated Content: {prompt}
+        return f"""# AI-Generated Content: {ctx.text}
 
 This content has been generated using advanced artificial intelligence technology, demonstrating the incredible capabilities of modern AI systems in content creation and analysis.
 
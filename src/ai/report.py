@@ -0,0 +1,225 @@
+"""Large multi-page PDF reports with embedded charts.
+
+``build_report`` lays out a (possibly lazy) stream of sections, each with a
+heading, paragraphs and an optional chart. Memory stays flat as the report
+grows:
+
+- sections are pulled from the caller's iterable only a few at a time and
+  handed to reportlab through a self-refilling story list, so the full set
+  of flowables never exists at once;
+- charts are rendered to PNG in a process pool, at most ``window`` ahead of
+  the page being laid out, and embedded from in-memory buffers;
+- chart specs carry pre-aggregated data (histogram counts, bar heights), not
+  raw columns.
+
+What does grow is reportlab's own store of finished, compressed pages, which
+is roughly the size of the output file.
+"""
+import os
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from io import BytesIO
+from xml.sax.saxutils import escape
+
+import numpy as np
+from pandas.api.types import is_numeric_dtype
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.figure import Figure
+from reportlab.lib import colors
+from reportlab.lib.pagesizes import letter
+from reportlab.lib.styles import ParagraphStyle, getSampleStyleSheet
+from reportlab.lib.units import inch
+from reportlab.platypus import Image, Paragraph, SimpleDocTemplate, Spacer
+
+CHART_DPI = 100
+CHART_SIZE = (6.5, 3.2)  # inches
+
+
+def render_chart(spec: dict) -> bytes:
+    """Render one chart spec to PNG bytes.
+
+    Uses the object-oriented matplotlib API (no pyplot state), so it is safe
+    to call from worker processes or threads and leaves no open figures.
+
+    Spec keys: ``kind`` (``hist``, ``bar`` or ``line``), ``title``, and
+    ``counts``/``edges`` for ``hist``, ``labels``/``values`` for ``bar``,
+    ``x``/``y`` for ``line``.
+    """
+    fig = Figure(figsize=CHART_SIZE, dpi=CHART_DPI)
+    FigureCanvasAgg(fig)
+    ax = fig.add_subplot(111)
+    kind = spec.get("kind", "line")
+    if kind == "hist":
+        edges = np.asarray(spec["edges"])
+        ax.stairs(spec["counts"], edges, fill=True, color="#4a6fa5")
+    elif kind == "bar":
+        ax.bar([str(label) for label in spec["labels"]], spec["values"], color="#4a6fa5")
+    else:
+        ax.plot(spec["x"], spec["y"], color="#4a6fa5", linewidth=2)
+    ax.set_title(spec.get("title", ""))
+    ax.grid(True, alpha=0.3)
+    fig.tight_layout()
+    buf = BytesIO()
+    fig.savefig(buf, format="png")
+    return buf.getvalue()
+
+
+def dataset_sections(df, target_column: str = "target", bins: int = 30):
+    """Yield report sections describing a dataset, one per column.
+
+    Numeric columns get summary statistics, their correlation with the
+    target and a histogram; other columns get their most frequent values.
+    """
+    has_target = target_column in df.columns
+    yield {
+        "heading": "Dataset Overview",
+        "paragraphs": [f"{len(df)} rows and {df.shape[1]} columns."],
+    }
+    if has_target:
+        counts = df[target_column].value_counts().sort_index()
+        yield {
+            "heading": "Target Distribution",
+            "paragraphs": [", ".join(f"{k}: {v}" for k, v in counts.items())],
+            "chart": {"kind": "bar", "title": f"{target_column} counts",
+                      "labels": counts.index.tolist(), "values": counts.values.tolist()},
+        }
+
+    for name in df.columns:
+        if name == target_column:
+            continue
+        col = df[name]
+        if is_numeric_dtype(col):
+            values = col.dropna().to_numpy(dtype=float)
+            if values.size == 0:
+                continue
+            text = (f"mean {values.mean():.4g}, std {values.std():.4g}, "
+                    f"min {values.min():.4g}, median {np.median(values):.4g}, max {values.max():.4g}, "
+                    f"missing {int(col.isna().sum())}.")
+            paragraphs = [text]
+            if has_target and is_numeric_dtype(df[target_column]):
+                corr = col.corr(df[target_column])
+                if not np.isnan(corr):
+                    paragraphs.append(f"Correlation with {target_column}: {corr:.3f}.")
+            counts, edges = np.histogram(values, bins=bins)
+            yield {
+                "heading": f"Column: {name}",
+                "paragraphs": paragraphs,
+                "chart": {"kind": "hist", "title": str(name),
+                          "counts": counts.tolist(), "edges": edges.tolist()},
+            }
+        else:
+            top = col.astype(str).value_counts().head(10)
+            yield {
+                "heading": f"Column: {name}",
+                "paragraphs": [f"{col.nunique()} distinct values."],
+                "chart": {"kind": "bar", "title": str(name),
+                          "labels": top.index.tolist(), "values": top.values.tolist()},
+            }
+
+
+class _FlowableStream(list):
+    """A story list that refills itself from an iterator of flowables.
+
+    reportlab's ``build`` checks ``len(story)`` before laying out each
+    flowable, which is where the buffer is topped up to ``lookahead`` items.
+    """
+
+    def __init__(self, source, lookahead: int = 16):
+        super().__init__()
+        self._source = iter(source)
+        self._lookahead = lookahead
+
+    def __len__(self):
+        while list.__len__(self) < self._lookahead:
+            try:
+                self.append(next(self._source))
+            except StopIteration:
+                break
+        return list.__len__(self)
+
+
+def _with_charts(sections, executor, window: int):
+    """Yield ``(section, png_or_future)`` with up to ``window`` charts in flight."""
+    pending = deque()
+    source = iter(sections)
+    exhausted = False
+    while True:
+        while not exhausted and len(pending) < window:
+            try:
+                section = next(source)
+            except StopIteration:
+                exhausted = True
+                break
+            chart = section.get("chart")
+            if chart is None:
+                pending.append((section, None))
+            elif executor is None:
+                pending.append((section, chart))  # rendered lazily below
+            else:
+                pending.append((section, executor.submit(render_chart, chart)))
+        if not pending:
+            return
+        section, chart = pending.popleft()
+        if chart is None:
+            yield section, None
+        elif executor is None:
+            yield section, render_chart(chart)
+        else:
+            yield section, chart.result()
+
+
+def build_report(sections, output, title: str = "AI Generated Report",
+                 workers: int | None = None, window: int | None = None) -> dict:
+    """Write a PDF report to ``output`` (a path or binary file object).
+
+    Parameters
+    ----------
+    sections : iterable of dict
+        Each with ``heading``, optional ``paragraphs`` (list of plain-text
+        str) and optional ``chart`` (see ``render_chart``). May be a generator.
+    workers : int | None
+        Chart rendering processes; defaults to the CPU count. ``0`` or ``1``
+        renders in-process.
+    window : int | None
+        Maximum charts rendered ahead of layout; defaults to ``2 * workers``.
+
+    Returns
+    -------
+    dict
+        ``pages``, ``sections`` and ``charts`` counts.
+    """
+    if workers is None:
+        workers = os.cpu_count() or 1
+    window = window or max(2, 2 * workers)
+    styles = getSampleStyleSheet()
+    title_style = ParagraphStyle(
+        'ReportTitle',
+        parent=styles['Heading1'],
+        fontSize=24,
+        spaceAfter=30,
+        textColor=colors.darkblue
+    )
+    counts = {"sections": 0, "charts": 0}
+
+    def flowables(executor):
+        yield Paragraph(escape(title), title_style)
+        yield Spacer(1, 20)
+        for section, png in _with_charts(sections, executor, window):
+            counts["sections"] += 1
+            yield Paragraph(escape(section["heading"]), styles['Heading2'])
+            yield Spacer(1, 12)
+            for text in section.get("paragraphs", ()):
+                yield Paragraph(escape(text), styles['Normal'])
+                yield Spacer(1, 12)
+            if png is not None:
+                counts["charts"] += 1
+                yield Image(BytesIO(png), width=CHART_SIZE[0] * inch, height=CHART_SIZE[1] * inch)
+                yield Spacer(1, 12)
+
+    doc = SimpleDocTemplate(output, pagesize=letter)
+    if workers > 1:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            doc.build(_FlowableStream(flowables(executor)))
+    else:
+        doc.build(_FlowableStream(flowables(None)))
+    return {"pages": doc.page, **counts}
@@ -0,0 +1,178 @@
+"""Training engines for AIModel.
+
+Two engines are available:
+
+- ``batch``: the original ``StandardScaler`` + ``LogisticRegression`` pipeline
+  fitted in one shot on a fully materialized matrix.
+- ``sgd``: an out-of-core engine that streams chunks through
+  ``StandardScaler.partial_fit`` and ``SGDClassifier.partial_fit`` so memory
+  is bounded by the chunk size rather than the dataset size.
+
+Both engines return a fitted two-step ``Pipeline``. The first step is a
+``standardscaler`` for purely numeric input, or a ``features`` step (see
+``features.FeaturePipeline``) for mixed numeric / categorical / text frames.
+"""
+import copy
+import itertools
+
+import numpy as np
+from sklearn.linear_model import LogisticRegression, SGDClassifier
+from sklearn.pipeline import Pipeline
+from sklearn.preprocessing import StandardScaler
+from threadpoolctl import threadpool_limits
+
+from .features import FeaturePipeline
+
+ENGINES = ("batch", "sgd")
+DEFAULT_CHUNK_SIZE = 10000
+LOGREG_MAX_ITER = 200
+
+
+def iter_chunks(X, y, chunk_size: int = DEFAULT_CHUNK_SIZE):
+    """Yield ``(X_chunk, y_chunk)`` slices of at most ``chunk_size`` rows.
+
+    Slicing keeps views for NumPy arrays and memmaps, so a memory-mapped
+    dataset is only paged in one chunk at a time.
+    """
+    n_rows = X.shape[0]
+    for start in range(0, n_rows, chunk_size):
+        stop = min(start + chunk_size, n_rows)
+        if hasattr(X, "iloc"):
+            X_chunk = X.iloc[start:stop]
+        else:
+            X_chunk = X[start:stop]
+        if hasattr(y, "iloc"):
+            y_chunk = y.iloc[start:stop]
+        else:
+            y_chunk = y[start:stop]
+        yield X_chunk, y_chunk
+
+
+def _as_dtype(X, dtype):
+    if dtype is None:
+        return X
+    return np.asarray(X, dtype=dtype)
+
+
+def _first_step(features):
+    if features is None:
+        return "standardscaler", StandardScaler()
+    return "features", features
+
+
+def _same_layout(first, prev_first, n_features: int, prev_clf) -> bool:
+    """Whether coefficients fitted after ``prev_first`` fit the columns of ``first``."""
+    if isinstance(first, FeaturePipeline):
+        # a refit can reorder or replace TF-IDF terms and categories
+        return first.same_layout(prev_first)
+    return not isinstance(prev_first, FeaturePipeline) and \
+        getattr(prev_clf, "n_features_in_", None) == n_features
+
+
+def fit_batch(X, y, solver: str = "lbfgs", n_jobs: int | None = None,
+              dtype=None, previous: Pipeline | None = None, features=None,
+              params: dict | None = None) -> Pipeline:
+    """Fit the one-shot scaler + logistic regression pipeline.
+
+    When ``previous`` is a batch pipeline with the same feature layout (the
+    same number of numeric columns, or for ``features`` the same
+    vocabularies and categories after refitting), its coefficients seed the
+    solver (``warm_start``) so retraining
+    on appended data converges in fewer iterations. The scaler is refitted on
+    the new data, so the seed is only approximate: the old coefficients were
+    learned on the previous scaler's mean and variance. It only saves
+    iterations; the fit still converges to the new optimum. ``n_jobs`` caps the BLAS
+    / OpenMP threads the solver runs on (``-1`` or ``None`` uses all cores).
+    ``features`` replaces the scaler with an (unfitted) ``FeaturePipeline``,
+    which then controls the dtype of the sparse matrix it builds.
+    ``params`` are extra ``LogisticRegression`` arguments, e.g. ``{"C": 0.1}``.
+    """
+    if features is None:
+        X = _as_dtype(X, dtype)
+    name, first = _first_step(features)
+    clf = LogisticRegression(**{"max_iter": LOGREG_MAX_ITER, "solver": solver, **(params or {})})
+    limit = None if n_jobs is None or n_jobs < 0 else n_jobs
+    with threadpool_limits(limits=limit):
+        X_t = first.fit_transform(X)
+        prev_clf = None
+        if previous is not None:
+            prev_clf = previous.named_steps.get("logisticregression")
+        if prev_clf is not None and _same_layout(first, previous.steps[0][1], X_t.shape[1], prev_clf):
+            clf.set_params(warm_start=True)
+            clf.coef_ = prev_clf.coef_.copy()
+            clf.intercept_ = prev_clf.intercept_.copy()
+        clf.fit(X_t, y)
+    return Pipeline([(name, first), ("logisticregression", clf)])
+
+
+def fit_stream(chunks, classes=None, n_jobs: int | None = None, dtype=None,
+               epochs: int = 1, previous: Pipeline | None = None, features=None,
+               params: dict | None = None) -> Pipeline:
+    """Fit the scaler + SGD pipeline incrementally over data chunks.
+
+    Parameters
+    ----------
+    chunks : iterable or callable
+        Iterable of ``(X_chunk, y_chunk)`` pairs. Pass a zero-argument
+        callable returning a fresh iterable to allow more than one epoch.
+    classes : array-like | None
+        All class labels. Required by ``partial_fit`` on the first chunk;
+        inferred from that chunk when omitted.
+    epochs : int
+        Number of passes over the data. The scaler statistics are updated
+        during the first pass only.
+    previous : Pipeline | None
+        A pipeline produced by this function to continue training from
+        (warm start on appended data). Training continues on copies of its
+        scaler and classifier, so ``previous`` keeps serving unchanged, and
+        only when the first chunk has the same feature layout (see
+        ``fit_batch``); otherwise it starts cold.
+    features : FeaturePipeline | None
+        An already fitted feature pipeline used in place of the scaler. Its
+        vocabulary and categories must be known up front, so it is applied
+        to each chunk but not updated. With ``previous``, training only
+        continues from the old classifier when ``features`` has the same
+        layout as the previous feature step; otherwise it starts cold.
+    params : dict | None
+        Extra ``SGDClassifier`` arguments for a fresh (non warm-started) model.
+    """
+    # peek at the first chunk to check its width against the previous model
+    first_pass = iter(chunks() if callable(chunks) else chunks)
+    head = next(first_pass, None)
+    if head is None:
+        raise ValueError("No data available to train on")
+    first_pass = itertools.chain([head], first_pass)
+
+    name, scaler = _first_step(features)
+    prev_clf = previous.named_steps.get("sgdclassifier") if previous is not None else None
+    if prev_clf is not None and _same_layout(scaler, previous.steps[0][1], np.shape(head[0])[1], prev_clf):
+        if features is None:
+            scaler = copy.deepcopy(previous.steps[0][1])
+        clf = copy.deepcopy(prev_clf)
+        classes = None  # already fixed by the previous fit
+        if dtype is None:
+            dtype = clf.coef_.dtype  # keep feeding the precision it was trained on
+    else:
+        clf = SGDClassifier(**{"loss": "log_loss", "n_jobs": n_jobs, "random_state": 0, **(params or {})})
+    numeric = isinstance(scaler, StandardScaler)
+
+    for epoch in range(max(1, epochs)):
+        if epoch == 0:
+            source = first_pass
+        elif callable(chunks):
+            source = chunks()
+        else:
+            break
+        for X_chunk, y_chunk in source:
+            if numeric:
+                X_chunk = _as_dtype(X_chunk, dtype)
+                if epoch == 0:
+                    scaler.partial_fit(X_chunk)
+            X_scaled = scaler.transform(X_chunk)
+            if classes is None and not hasattr(clf, "classes_"):
+                classes = np.unique(y_chunk)
+            clf.partial_fit(X_scaled, y_chunk, classes=classes)
+
+    if not hasattr(clf, "classes_"):
+        raise ValueError("No data available to train on")
+    return Pipeline([(name, scaler), ("sgdclassifier", clf)])
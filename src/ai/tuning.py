@@ -0,0 +1,256 @@
+"""Hyperparameter search by parallel successive halving.
+
+Candidates are all combinations of a model grid (``LogisticRegression``
+arguments) and, for mixed-type frames, a feature grid (``FeaturePipeline``
+arguments). The search:
+
+1. splits the data into stratified folds once and, for every distinct
+   feature configuration, fits the scaler / vectorizers on each training
+   fold once. The resulting matrices are cached and shared by every
+   candidate with that configuration, so no vectorizer is refitted per
+   candidate or per rung;
+2. evaluates all candidates on a small row budget, keeps the best
+   ``1 / eta`` and multiplies the budget by ``eta``, until at most ``eta``
+   finalists remain, which are scored on the full training folds. Every
+   (candidate, fold) fit in a rung runs in a process pool that receives the
+   fold cache once, through its initializer;
+3. refits the finalists on all rows and measures their inference cost, so
+   the winner can be chosen under a latency budget.
+"""
+import itertools
+import math
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+from sklearn.linear_model import LogisticRegression
+from sklearn.model_selection import ParameterGrid, StratifiedKFold
+from sklearn.preprocessing import StandardScaler
+from threadpoolctl import threadpool_limits
+
+from .features import FeaturePipeline, needs_feature_pipeline
+from .model import AIModel
+from .training import LOGREG_MAX_ITER
+
+DEFAULT_GRID = {
+    "model": {"C": [0.01, 0.1, 1.0, 10.0], "class_weight": [None, "balanced"]},
+    "features": {"max_text_features": [100, 1000, 5000], "max_categories": [10, 50]},
+}
+MIN_ROWS = 100
+
+_worker_folds = None
+
+
+def _init_worker(folds) -> None:
+    global _worker_folds
+    _worker_folds = folds
+    # one BLAS thread per process; the pool provides the parallelism
+    threadpool_limits(limits=1)
+
+
+def expand_grid(grid: dict, mixed: bool) -> list:
+    """Candidates as ``{"model": {...}, "features": {...}}`` dicts.
+
+    The feature grid only applies to frames with categorical or text columns.
+    """
+    model_grid = list(ParameterGrid(grid.get("model") or {}))
+    feature_grid = list(ParameterGrid(grid.get("features") or {})) if mixed else [{}]
+    return [{"model": m, "features": f} for f, m in itertools.product(feature_grid, model_grid)]
+
+
+def _feature_key(params: dict) -> tuple:
+    return tuple(sorted(params.items()))
+
+
+def prepare_folds(X, y, feature_configs, n_folds: int = 3, seed: int = 0) -> dict:
+    """Featurize every fold once per feature configuration.
+
+    Returns a dict mapping ``(feature_key, fold)`` to
+    ``(X_train, y_train, X_val, y_val)``. Training rows are shuffled so that
+    a row budget can be applied by slicing a prefix.
+    """
+    y = np.asarray(y)
+    mixed = needs_feature_pipeline(X)
+    rng = np.random.RandomState(seed)
+    splitter = StratifiedKFold(n_splits=n_folds, shuffle=True, random_state=seed)
+    folds = {}
+    for fold, (train_idx, val_idx) in enumerate(splitter.split(np.zeros(len(y)), y)):
+        train_idx = rng.permutation(train_idx)
+        if mixed:
+            X_train, X_val = X.iloc[train_idx], X.iloc[val_idx]
+        else:
+            values = np.asarray(X, dtype=float)
+            X_train, X_val = values[train_idx], values[val_idx]
+        for params in feature_configs:
+            step = FeaturePipeline(**params) if mixed else StandardScaler()
+            folds[(_feature_key(params), fold)] = (step.fit_transform(X_train), y[train_idx],
+                                                   step.transform(X_val), y[val_idx])
+    return folds
+
+
+def _evaluate(feature_key: tuple, fold: int, rows: int, model_params: dict, folds=None) -> tuple:
+    """Fit one candidate on ``rows`` training rows of a fold; ``(accuracy, seconds)``."""
+    X_train, y_train, X_val, y_val = (folds or _worker_folds)[(feature_key, fold)]
+    clf = LogisticRegression(**{"max_iter": LOGREG_MAX_ITER, **model_params})
+    start = time.perf_counter()
+    try:
+        clf.fit(X_train[:rows], y_train[:rows])
+    except ValueError:  # e.g. a single class in a tiny budget
+        return float("nan"), time.perf_counter() - start
+    seconds = time.perf_counter() - start
+    return clf.score(X_val, y_val), seconds
+
+
+def successive_halving(candidates: list, folds: dict, n_folds: int, eta: int = 3,
+                       min_rows: int | None = None, workers: int | None = None,
+                       progress=None) -> tuple:
+    """Run the halving rungs.
+
+    Returns
+    -------
+    tuple
+        ``(results, rungs)``: one result dict per candidate (score and row
+        budget of the last rung it reached) and one summary per rung.
+    """
+    workers = workers or os.cpu_count() or 1
+    n_rows = min(entry[0].shape[0] for entry in folds.values())
+    if min_rows is None:
+        halvings = max(0, math.ceil(math.log(max(len(candidates), 1) / eta, eta)))
+        min_rows = n_rows // eta ** halvings
+    min_rows = min(n_rows, max(MIN_ROWS, min_rows))
+
+    results = [{"id": i, **candidate} for i, candidate in enumerate(candidates)]
+    survivors = list(range(len(candidates)))
+    rungs = []
+    executor = None
+    if workers > 1:
+        executor = ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(folds,))
+    try:
+        for rung in itertools.count():
+            rows = n_rows if len(survivors) <= eta else min(n_rows, min_rows * eta ** rung)
+            tasks = [(i, fold) for i in survivors for fold in range(n_folds)]
+            start = time.perf_counter()
+            if executor is None:
+                outcomes = [_evaluate(_feature_key(results[i]["features"]), fold, rows,
+                                      results[i]["model"], folds) for i, fold in tasks]
+            else:
+                futures = [executor.submit(_evaluate, _feature_key(results[i]["features"]), fold,
+                                           rows, results[i]["model"]) for i, fold in tasks]
+                outcomes = [f.result() for f in futures]
+            for i in survivors:
+                scores = [score for (j, _), (score, _) in zip(tasks, outcomes) if j == i]
+                fit_seconds = [sec for (j, _), (_, sec) in zip(tasks, outcomes) if j == i]
+                score = float(np.nanmean(scores)) if not np.all(np.isnan(scores)) else float("nan")
+                results[i].update(score=score, rows=rows, rung=rung,
+                                  fit_seconds=float(np.mean(fit_seconds)))
+            rungs.append({"rung": rung, "rows": rows, "candidates": len(survivors),
+                          "seconds": time.perf_counter() - start})
+            if progress is not None:
+                best = max(_rank_score(results[i]) for i in survivors)
+                progress(f"Rung {rung}: {len(survivors)} candidates on {rows} rows, best accuracy {best:.4f}")
+            if rows >= n_rows:
+                break
+            ranked = sorted(survivors, key=lambda i: _rank_score(results[i]), reverse=True)
+            survivors = ranked[:max(1, math.ceil(len(survivors) / eta))]
+    finally:
+        if executor is not None:
+            executor.shutdown()
+    return results, rungs
+
+
+def _rank_score(result: dict) -> float:
+    score = result.get("score", float("nan"))
+    return -math.inf if math.isnan(score) else score
+
+
+def inference_cost(model: AIModel, X, single_calls: int = 200, batch_rows: int = 1000) -> dict:
+    """Median single-row latency and per-row batch cost of ``model.predict``."""
+    row = X.iloc[[0]] if hasattr(X, "iloc") else X[:1]
+    timings = []
+    for _ in range(single_calls):
+        start = time.perf_counter()
+        model.predict(row)
+        timings.append(time.perf_counter() - start)
+    batch = X.iloc[:batch_rows] if hasattr(X, "iloc") else X[:batch_rows]
+    batch_seconds = math.inf
+    for _ in range(3):
+        start = time.perf_counter()
+        model.predict(batch)
+        batch_seconds = min(batch_seconds, time.perf_counter() - start)
+    return {"latency_ms": float(np.median(timings) * 1e3),
+            "batch_us_per_row": batch_seconds / len(batch) * 1e6}
+
+
+def tune(X, y, grid: dict | None = None, n_folds: int = 3, eta: int = 3,
+         workers: int | None = None, max_latency_ms: float | None = None, progress=None) -> tuple:
+    """Search ``grid`` and return ``(winning_model, report)``.
+
+    Parameters
+    ----------
+    X : DataFrame or array-like
+        Features as returned by ``Dataset.preprocess_data``. Purely numeric
+        frames are converted to a plain matrix, as in bulk prediction.
+    grid : dict | None
+        ``{"model": {...}, "features": {...}}`` lists of values per argument;
+        defaults to ``DEFAULT_GRID``.
+    max_latency_ms : float | None
+        Single-row latency budget. The winner is the most accurate finalist
+        within budget, or the fastest finalist if none fits.
+
+    Returns
+    -------
+    tuple
+        The winner refitted on all rows (an ``AIModel``) and a JSON-ready
+        report with every candidate's accuracy and the finalists' costs.
+    """
+    grid = grid or DEFAULT_GRID
+    mixed = needs_feature_pipeline(X)
+    if not mixed:
+        X = np.asarray(X, dtype=float)
+    y = np.asarray(y)
+    candidates = expand_grid(grid, mixed)
+    feature_configs = {_feature_key(c["features"]): c["features"] for c in candidates}
+
+    start = time.perf_counter()
+    folds = prepare_folds(X, y, list(feature_configs.values()), n_folds)
+    prepare_seconds = time.perf_counter() - start
+    if progress is not None:
+        progress(f"Cached {len(folds)} featurized folds for {len(candidates)} candidates "
+                 f"in {prepare_seconds:.2f}s")
+    results, rungs = successive_halving(candidates, folds, n_folds, eta=eta,
+                                        workers=workers, progress=progress)
+    del folds
+
+    last_rung = rungs[-1]["rung"]
+    finalists = [r for r in results if r["rung"] == last_rung]
+    models = {}
+    for result in finalists:
+        model = AIModel()
+        model.train_model(X, y, model_params=result["model"], feature_params=result["features"] or None)
+        result.update(inference_cost(model, X))
+        models[result["id"]] = model
+
+    within = [r for r in finalists if max_latency_ms is None or r["latency_ms"] <= max_latency_ms]
+    if within:
+        winner = max(within, key=lambda r: (_rank_score(r), -r["latency_ms"]))
+    else:
+        winner = min(finalists, key=lambda r: r["latency_ms"])
+
+    ranked = sorted(results, key=lambda r: (r["rung"], _rank_score(r)), reverse=True)
+    for result in ranked:
+        if math.isnan(result["score"]):
+            result["score"] = None  # keep the report valid JSON
+    report = {
+        "candidates": len(candidates),
+        "folds": n_folds,
+        "eta": eta,
+        "feature_configs": len(feature_configs),
+        "prepare_seconds": prepare_seconds,
+        "rungs": rungs,
+        "max_latency_ms": max_latency_ms,
+        "within_budget": bool(within),
+        "winner": winner["id"],
+        "results": ranked,
+    }
+    return models[winner["id"]], report
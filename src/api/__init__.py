@@ -0,0 +1 @@
+"""api package for Manus AI."""
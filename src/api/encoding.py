@@ -0,0 +1,111 @@
+"""Response shaping, encoding and compression for prediction results.
+
+Clients can trim responses down to the bytes they actually use:
+
+- ``echo=0`` drops the echoed input (``input``, ``features``, ``text``,
+  ``prompt``) from the result.
+- ``fields=prediction,type`` keeps only the listed top-level keys.
+- ``Accept: application/msgpack`` selects MessagePack (requires ``msgpack``);
+  JSON is encoded with ``orjson`` when installed, otherwise compact stdlib JSON.
+- ``Accept-Encoding: br`` / ``gzip`` compresses bodies above a size threshold
+  (brotli requires the ``brotli`` package).
+"""
+import gzip
+import json
+
+import numpy as np
+
+try:
+    import orjson
+except ImportError:  # optional, falls back to the stdlib encoder
+    orjson = None
+
+try:
+    import msgpack
+except ImportError:  # optional, MessagePack is simply not offered
+    msgpack = None
+
+try:
+    import brotli
+except ImportError:  # optional, gzip is still available
+    brotli = None
+
+JSON_TYPE = "application/json"
+MSGPACK_TYPES = ("application/msgpack", "application/x-msgpack")
+ECHO_KEYS = ("input", "features", "text", "prompt")
+COMPRESS_MIN_BYTES = 1024
+
+
+def _default(obj):
+    """Serialize the NumPy scalars and arrays that model results contain."""
+    if isinstance(obj, np.generic):
+        return obj.item()
+    if isinstance(obj, np.ndarray):
+        return obj.tolist()
+    raise TypeError(f"Object of type {type(obj).__name__} is not serializable")
+
+
+def parse_fields(value) -> list | None:
+    """Accept ``"a,b"`` or ``["a", "b"]``; return ``None`` when unset."""
+    if value is None or value == "":
+        return None
+    if isinstance(value, str):
+        value = value.split(",")
+    return [str(f).strip() for f in value if str(f).strip()]
+
+
+def parse_flag(value, default: bool = True) -> bool:
+    if value is None:
+        return default
+    if isinstance(value, bool):
+        return value
+    return str(value).strip().lower() not in ("0", "false", "no", "off")
+
+
+def shape_result(body, fields: list | None = None, echo: bool = True):
+    """Apply field selection and input-echo removal to a result dict."""
+    if not isinstance(body, dict):
+        return body
+    if fields is not None:
+        body = {k: body[k] for k in fields if k in body}
+    if not echo:
+        body = {k: v for k, v in body.items() if k not in ECHO_KEYS}
+    return body
+
+
+def available_types() -> list:
+    types = [JSON_TYPE]
+    if msgpack is not None:
+        types.extend(MSGPACK_TYPES)
+    return types
+
+
+def encode(body, mimetype: str = JSON_TYPE) -> bytes:
+    """Encode ``body`` as JSON or MessagePack."""
+    if mimetype in MSGPACK_TYPES and msgpack is not None:
+        return msgpack.packb(body, default=_default, use_bin_type=True)
+    if orjson is not None:
+        return orjson.dumps(body, default=_default, option=orjson.OPT_SERIALIZE_NUMPY)
+    return json.dumps(body, default=_default, separators=(",", ":")).encode()
+
+
+def choose_encoding(size: int, accept_encodings, min_size: int = COMPRESS_MIN_BYTES) -> str | None:
+    """Content encoding to use for a body of ``size`` bytes, or ``None``."""
+    if size < min_size:
+        return None
+    offered = (["br"] if brotli is not None else []) + ["gzip"]
+    return accept_encodings.best_match(offered) if accept_encodings else None
+
+
+def compress_as(data: bytes, encoding: str | None) -> bytes:
+    if encoding == "br":
+        return brotli.compress(data, quality=5)
+    if encoding == "gzip":
+        return gzip.compress(data, compresslevel=5, mtime=0)  # byte-stable for ETags
+    return data
+
+
+def compress(data: bytes, accept_encodings, min_size: int = COMPRESS_MIN_BYTES):
+    """Return ``(data, content_encoding)``; encoding is ``None`` if unchanged."""
+    encoding = choose_encoding(len(data), accept_encodings, min_size)
+    return compress_as(data, encoding), encoding
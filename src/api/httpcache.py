@@ -0,0 +1,72 @@
+"""HTTP validators and precomputed bodies for cacheable responses.
+
+``StaticResponse`` serializes a body once, keeps its gzip / brotli variants
+(built on first use), and tags each with a strong content-hash ``ETag``.
+``add_validators`` tags a dynamic response the same way. Both answer a
+matching ``If-None-Match`` on GET/HEAD with an empty ``304``, so pollers
+and intermediate caches revalidate instead of downloading the body again.
+"""
+import hashlib
+import threading
+
+from flask import Response
+
+from .encoding import choose_encoding, compress_as
+
+STATIC_CACHE_CONTROL = "public, max-age=300"
+REVALIDATE_CACHE_CONTROL = "no-cache"
+
+
+def content_etag(data: bytes) -> str:
+    """Strong validator derived from the exact bytes sent."""
+    return hashlib.blake2b(data, digest_size=16).hexdigest()
+
+
+def add_validators(resp: Response, request, cache_control: str = REVALIDATE_CACHE_CONTROL,
+                   etag: str | None = None, weak: bool = False) -> Response:
+    """Attach ``ETag`` and ``Cache-Control`` and turn a matching GET into ``304``.
+
+    ``etag`` defaults to the hash of the response body. Pass an explicit
+    (usually ``weak``) tag when the body carries volatile details that do
+    not change its meaning.
+    """
+    resp.set_etag(etag or content_etag(resp.get_data()), weak=weak)
+    resp.headers["Cache-Control"] = cache_control
+    return resp.make_conditional(request)
+
+
+class StaticResponse:
+    """A response body that never changes for the life of the app.
+
+    Parameters
+    ----------
+    data : bytes
+        The serialized body.
+    mimetype : str
+    cache_control : str
+        ``Cache-Control`` sent with every response (and 304).
+    """
+
+    def __init__(self, data: bytes, mimetype: str, cache_control: str = STATIC_CACHE_CONTROL):
+        self.mimetype = mimetype
+        self.cache_control = cache_control
+        self._variants = {None: (data, content_etag(data))}
+        self._lock = threading.Lock()
+
+    def _variant(self, accept_encodings):
+        data, _ = self._variants[None]
+        encoding = choose_encoding(len(data), accept_encodings)
+        if encoding not in self._variants:
+            with self._lock:
+                if encoding not in self._variants:
+                    encoded = compress_as(data, encoding)
+                    self._variants[encoding] = (encoded, content_etag(encoded))
+        return encoding, self._variants[encoding]
+
+    def __call__(self, request) -> Response:
+        encoding, (data, etag) = self._variant(request.accept_encodings)
+        resp = Response(data, mimetype=self.mimetype)
+        if encoding:
+            resp.headers["Content-Encoding"] = encoding
+        resp.vary.add("Accept-Encoding")
+        return add_validators(resp, request, self.cache_control, etag=etag)
@@ -0,0 +1,157 @@
+"""Binary feature ingestion for the numeric ``/predict`` path.
+
+Request bodies are read from the WSGI stream in fixed-size chunks straight
+into one preallocated buffer, with a hard size limit, and then wrapped as a
+NumPy array without creating per-element Python objects:
+
+- ``application/x-npy``: a single ``.npy`` file; the array aliases the
+  request buffer (no copy).
+- ``application/vnd.apache.arrow.stream`` / ``application/vnd.apache.arrow.file``:
+  an Arrow IPC table of numeric columns (requires ``pyarrow``). Columns are
+  copied once into a row-major float matrix, as sklearn needs.
+"""
+from io import BytesIO
+
+import numpy as np
+
+NPY_TYPES = ("application/x-npy", "application/npy")
+ARROW_STREAM_TYPES = ("application/vnd.apache.arrow.stream",)
+ARROW_FILE_TYPES = ("application/vnd.apache.arrow.file", "application/x-arrow")
+BINARY_TYPES = NPY_TYPES + ARROW_STREAM_TYPES + ARROW_FILE_TYPES
+
+DEFAULT_MAX_BODY_BYTES = 256 * 1024 * 1024
+READ_CHUNK_BYTES = 1024 * 1024
+
+
+class BodyTooLarge(ValueError):
+    """Raised when a request body exceeds the configured limit."""
+
+
+class UnsupportedFormat(ValueError):
+    """Raised when a binary body cannot be decoded in this environment."""
+
+
+def is_binary_type(mimetype: str | None) -> bool:
+    return (mimetype or "").lower() in BINARY_TYPES
+
+
+def read_body(stream, content_length: int | None, max_bytes: int = DEFAULT_MAX_BODY_BYTES,
+              chunk_size: int = READ_CHUNK_BYTES) -> memoryview:
+    """Read a request body in chunks, refusing anything above ``max_bytes``.
+
+    With a ``Content-Length`` the buffer is allocated once and filled with
+    ``readinto``; chunked uploads grow the buffer as data arrives.
+    """
+    if content_length is not None and content_length > max_bytes:
+        raise BodyTooLarge(f"request body of {content_length} bytes exceeds limit of {max_bytes}")
+
+    if content_length is not None:
+        buf = bytearray(content_length)
+        view = memoryview(buf)
+        filled = 0
+        while filled < content_length:
+            stop = min(filled + chunk_size, content_length)
+            n = stream.readinto(view[filled:stop]) if hasattr(stream, "readinto") else None
+            if n is None:
+                data = stream.read(stop - filled)
+                n = len(data)
+                view[filled:filled + n] = data
+            if n == 0:
+                raise ValueError("request body ended early")
+            filled += n
+        return view
+
+    buf = bytearray()
+    while True:
+        data = stream.read(chunk_size)
+        if not data:
+            break
+        buf += data
+        if len(buf) > max_bytes:
+            raise BodyTooLarge(f"request body exceeds limit of {max_bytes} bytes")
+    return memoryview(buf)
+
+
+def parse_npy(body) -> np.ndarray:
+    """Decode a ``.npy`` payload as an array that aliases ``body``."""
+    header = np.lib.format
+    raw = memoryview(body)
+    reader = _BufferReader(raw)
+    version = header.read_magic(reader)
+    if version == (1, 0):
+        shape, fortran_order, dtype = header.read_array_header_1_0(reader)
+    elif version in ((2, 0), (3, 0)):
+        shape, fortran_order, dtype = header.read_array_header_2_0(reader)
+    else:
+        raise ValueError(f"unsupported .npy version {version}")
+    if dtype.hasobject:
+        raise ValueError("object arrays are not accepted")
+    count = int(np.prod(shape)) if shape else 1
+    if raw.nbytes < reader.pos + count * dtype.itemsize:
+        raise ValueError("truncated .npy payload")
+    arr = np.frombuffer(raw, dtype=dtype, count=count, offset=reader.pos)
+    return arr.reshape(shape, order="F" if fortran_order else "C")
+
+
+def parse_arrow(body, file_format: bool = False) -> np.ndarray:
+    """Decode an Arrow IPC table of numeric columns into a 2-D float array."""
+    try:
+        import pyarrow as pa
+    except ImportError as e:
+        raise UnsupportedFormat("Arrow payloads require pyarrow to be installed") from e
+
+    source = pa.py_buffer(body)
+    if file_format:
+        table = pa.ipc.open_file(source).read_all()
+    else:
+        table = pa.ipc.open_stream(source).read_all()
+
+    out = np.empty((table.num_rows, table.num_columns), dtype=np.float64)
+    for j, column in enumerate(table.columns):
+        if not (pa.types.is_integer(column.type) or pa.types.is_floating(column.type)):
+            raise ValueError(f"column '{table.column_names[j]}' is not numeric")
+        row = 0
+        for chunk in column.chunks:
+            values = chunk.to_numpy(zero_copy_only=chunk.null_count == 0)
+            out[row:row + len(values), j] = values
+            row += len(values)
+    return out
+
+
+def parse_features(body, mimetype: str) -> np.ndarray:
+    """Dispatch on the request mimetype and return a 2-D feature matrix."""
+    mimetype = mimetype.lower()
+    if mimetype in NPY_TYPES:
+        arr = parse_npy(body)
+    elif mimetype in ARROW_STREAM_TYPES:
+        arr = parse_arrow(body)
+    elif mimetype in ARROW_FILE_TYPES:
+        arr = parse_arrow(body, file_format=True)
+    else:
+        raise UnsupportedFormat(f"unsupported content type '{mimetype}'")
+    if arr.ndim == 1:
+        arr = arr.reshape(1, -1)
+    if arr.ndim != 2:
+        raise ValueError(f"expected a 2-D feature matrix, got shape {arr.shape}")
+    return arr
+
+
+def encode_npy(arr: np.ndarray) -> bytes:
+    """Serialize ``arr`` as ``.npy`` bytes for binary responses."""
+    buf = BytesIO()
+    np.lib.format.write_array(buf, np.ascontiguousarray(arr), allow_pickle=False)
+    return buf.getvalue()
+
+
+class _BufferReader:
+    """Minimal file-like reader over a memoryview for the .npy header parser."""
+
+    def __init__(self, view: memoryview):
+        self._view = view
+        self.pos = 0
+
+    def read(self, n: int = -1) -> bytes:
+        end = len(self._view) if n < 0 else min(self.pos + n, len(self._view))
+        data = self._view[self.pos:end].tobytes()
+        self.pos = end
+        return data
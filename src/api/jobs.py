@@ -0,0 +1,177 @@
+"""Asynchronous jobs for long-running generation requests.
+
+``JobManager`` runs submitted callables on a small pool of worker threads fed
+from a bounded queue, so heavy PDF and image requests do not hold an HTTP
+connection (and a server thread) for their whole duration. Callers poll a job
+by id, optionally blocking until it finishes (long-poll), and may cancel it.
+Finished jobs are kept for ``ttl`` seconds and then dropped.
+"""
+import threading
+import time
+import uuid
+from collections import deque
+
+QUEUED = "queued"
+RUNNING = "running"
+SUCCEEDED = "succeeded"
+FAILED = "failed"
+CANCELLED = "cancelled"
+FINAL_STATES = (SUCCEEDED, FAILED, CANCELLED)
+
+
+class JobQueueFull(Exception):
+    """Raised by ``submit`` when the pending-job queue is at capacity."""
+
+
+class Job:
+    def __init__(self, fn, capability: str | None = None):
+        self.id = uuid.uuid4().hex
+        self.fn = fn
+        self.capability = capability
+        self.status = QUEUED
+        self.result = None
+        self.error = None
+        self.created = time.time()
+        self.started = None
+        self.finished = None
+        self.cancel_requested = False
+        self._done = threading.Event()
+
+    def wait(self, timeout: float | None = None) -> bool:
+        """Block until the job reaches a final state or ``timeout`` elapses."""
+        return self._done.wait(timeout)
+
+    def to_dict(self) -> dict:
+        return {
+            "job_id": self.id,
+            "status": self.status,
+            "capability": self.capability,
+            "created": self.created,
+            "started": self.started,
+            "finished": self.finished,
+            "error": self.error,
+        }
+
+
+class JobManager:
+    """Bounded job queue served by ``workers`` daemon threads.
+
+    The threads are started by the first ``submit``, so an app that never
+    receives a job never starts them.
+
+    Parameters
+    ----------
+    workers : int
+        Number of jobs executed concurrently.
+    max_queue : int
+        Jobs allowed to wait for a worker before ``submit`` refuses more.
+        A cancelled job gives its place back immediately.
+    ttl : float
+        Seconds a finished job (and its result) is retained.
+    """
+
+    def __init__(self, workers: int = 2, max_queue: int = 64, ttl: float = 600.0):
+        self.workers = workers
+        self.max_queue = max_queue
+        self.ttl = ttl
+        self._pending = deque()
+        self._jobs = {}
+        self._lock = threading.Lock()
+        self._ready = threading.Condition(self._lock)
+        self._threads = []
+
+    def submit(self, fn, capability: str | None = None) -> Job:
+        """Enqueue ``fn`` (a zero-argument callable) and return its job."""
+        self._prune()
+        job = Job(fn, capability)
+        with self._lock:
+            if len(self._pending) >= self.max_queue:
+                raise JobQueueFull(f"job queue is full ({self.max_queue} pending)")
+            if not self._threads:
+                self._start_workers()
+            self._jobs[job.id] = job
+            self._pending.append(job)
+            self._ready.notify()
+        return job
+
+    def _start_workers(self) -> None:
+        for i in range(self.workers):
+            t = threading.Thread(target=self._worker, name=f"job-worker-{i}", daemon=True)
+            t.start()
+            self._threads.append(t)
+
+    def get(self, job_id: str) -> Job | None:
+        self._prune()
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def cancel(self, job_id: str) -> Job | None:
+        """Cancel a queued job, or flag a running one so its result is discarded."""
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None or job.status in FINAL_STATES:
+                return job
+            job.cancel_requested = True
+            if job.status == QUEUED:
+                self._pending.remove(job)
+                self._finish(job, CANCELLED)
+            return job
+
+    def wait_idle(self, timeout: float | None = None) -> bool:
+        """Block until no job is queued or running; ``False`` on timeout."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            with self._lock:
+                busy = [job for job in self._jobs.values() if job.status not in FINAL_STATES]
+            if not busy:
+                return True
+            remaining = None if deadline is None else deadline - time.monotonic()
+            if remaining is not None and remaining <= 0:
+                return False
+            busy[0].wait(remaining)
+
+    def stats(self) -> dict:
+        with self._lock:
+            counts = {}
+            for job in self._jobs.values():
+                counts[job.status] = counts.get(job.status, 0) + 1
+            pending = len(self._pending)
+        return {"pending": pending, "max_queue": self.max_queue,
+                "workers": self.workers, "jobs": counts}
+
+    def _finish(self, job: Job, status: str, result=None, error: str | None = None) -> None:
+        job.status = status
+        job.result = result
+        job.error = error
+        job.finished = time.time()
+        job.fn = None  # release captured request data
+        job._done.set()
+
+    def _prune(self) -> None:
+        cutoff = time.time() - self.ttl
+        with self._lock:
+            expired = [jid for jid, job in self._jobs.items()
+                       if job.finished is not None and job.finished < cutoff]
+            for jid in expired:
+                del self._jobs[jid]
+
+    def _worker(self) -> None:
+        while True:
+            with self._lock:
+                while not self._pending:
+                    self._ready.wait()
+                job = self._pending.popleft()
+                job.status = RUNNING
+                job.started = time.time()
+                fn = job.fn
+            try:
+                result = fn()
+            except Exception as e:
+                with self._lock:
+                    self._finish(job, CANCELLED if job.cancel_requested else FAILED, error=str(e))
+                continue
+            with self._lock:
+                if job.cancel_requested:
+                    self._finish(job, CANCELLED)
+                else:
+                    self._finish(job, SUCCEEDED, result=result)
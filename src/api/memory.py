@@ -0,0 +1,178 @@
+"""Memory governance for long-running server workers.
+
+``MemoryWatchdog`` samples the process's resident set size and the number of
+open matplotlib figures on a background thread, keeps a short history for
+``/metrics``, and can produce a ``tracemalloc`` top-allocators report when
+tracing is enabled. It also counts requests. Once RSS stays above
+``rss_limit`` (after a forced garbage collection) or the worker has served
+``max_requests``, the watchdog trips once and calls ``on_recycle`` so the
+worker can drain and be replaced by its supervisor.
+"""
+import gc
+import os
+import random
+import sys
+import threading
+import time
+import tracemalloc
+from collections import deque
+
+try:  # optional, more portable RSS readings
+    import psutil
+except ImportError:  # pragma: no cover - depends on environment
+    psutil = None
+
+STAT_KEYS = ("lineno", "filename", "traceback")
+
+
+def rss_bytes() -> int | None:
+    """Current resident set size of this process, or ``None`` if unknown."""
+    if psutil is not None:
+        return psutil.Process().memory_info().rss
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        return None
+
+
+def open_figures() -> int:
+    """Number of pyplot figures still open (0 if pyplot was never imported)."""
+    plt = sys.modules.get("matplotlib.pyplot")
+    return len(plt.get_fignums()) if plt is not None else 0
+
+
+class MemoryWatchdog:
+    """Samples memory use and decides when a worker should be recycled.
+
+    Parameters
+    ----------
+    rss_limit : int | None
+        Resident set size in bytes above which the worker is recycled.
+    max_requests : int
+        Requests served before the worker is recycled; ``0`` disables. Up to
+        10% random jitter is added so that workers started together do not
+        all restart at once.
+    interval : float
+        Seconds between background samples.
+    tracemalloc_frames : int
+        Start ``tracemalloc`` with this many frames per allocation for the
+        top-allocators report; ``0`` leaves tracing off (it costs CPU and
+        memory on every allocation).
+    history : int
+        Number of samples kept.
+    on_recycle : callable | None
+        Called once, on its own thread, with the reason for recycling.
+    """
+
+    def __init__(self, rss_limit: int | None = None, max_requests: int = 0,
+                 interval: float = 30.0, tracemalloc_frames: int = 0, history: int = 120,
+                 on_recycle=None):
+        self.rss_limit = rss_limit or None
+        self.max_requests = max_requests + random.randint(0, max_requests // 10) if max_requests > 0 else 0
+        self.interval = interval
+        self.on_recycle = on_recycle
+        self.samples = deque(maxlen=history)
+        self.requests = 0
+        self.active = 0
+        self.started = time.time()
+        self.recycle_reason = None
+        self._lock = threading.Lock()
+        self._idle = threading.Condition(self._lock)
+        self._stop = threading.Event()
+        self._thread = None
+        if tracemalloc_frames > 0 and not tracemalloc.is_tracing():
+            tracemalloc.start(tracemalloc_frames)
+
+    def start(self) -> "MemoryWatchdog":
+        """Take a first sample and keep sampling every ``interval`` seconds."""
+        self.sample()
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="memory-watchdog", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._stop.set()
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            self.sample()
+
+    def sample(self) -> dict:
+        """Record RSS and open figures now; trips the RSS limit if exceeded."""
+        rss = rss_bytes()
+        if self.rss_limit and rss is not None and rss > self.rss_limit:
+            # garbage that is merely uncollected should not cost a restart
+            gc.collect()
+            rss = rss_bytes()
+        entry = {"time": time.time(), "rss": rss, "figures": open_figures(), "requests": self.requests}
+        self.samples.append(entry)
+        if self.rss_limit and rss is not None and rss > self.rss_limit:
+            self._trip(f"rss {rss} bytes exceeds limit {self.rss_limit}")
+        return entry
+
+    def request_started(self) -> None:
+        with self._lock:
+            self.active += 1
+
+    def request_finished(self) -> None:
+        with self._lock:
+            self.active -= 1
+            self.requests += 1
+            served = self.requests
+            if self.active == 0:
+                self._idle.notify_all()
+        if self.max_requests and served >= self.max_requests:
+            self._trip(f"served {served} requests (limit {self.max_requests})")
+
+    @property
+    def draining(self) -> bool:
+        return self.recycle_reason is not None
+
+    def wait_idle(self, timeout: float | None = None) -> bool:
+        """Block until no request is in flight; ``False`` on timeout."""
+        with self._idle:
+            return self._idle.wait_for(lambda: self.active <= 0, timeout)
+
+    def _trip(self, reason: str) -> None:
+        with self._lock:
+            if self.recycle_reason is not None:
+                return
+            self.recycle_reason = reason
+        if self.on_recycle is not None:
+            threading.Thread(target=self.on_recycle, args=(reason,), name="memory-recycle",
+                             daemon=True).start()
+
+    def top_allocations(self, limit: int = 20, key: str = "lineno") -> list | None:
+        """Largest live allocation sites, or ``None`` when tracemalloc is off."""
+        if not tracemalloc.is_tracing():
+            return None
+        if key not in STAT_KEYS:
+            key = "lineno"
+        snapshot = tracemalloc.take_snapshot().filter_traces((
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+        ))
+        return [{"size": stat.size, "count": stat.count,
+                 "traceback": [f"{frame.filename}:{frame.lineno}" for frame in stat.traceback]}
+                for stat in snapshot.statistics(key)[:limit]]
+
+    def stats(self) -> dict:
+        last = self.samples[-1] if self.samples else {}
+        peak = max((s["rss"] for s in self.samples if s["rss"] is not None), default=None)
+        return {
+            "pid": os.getpid(),
+            "uptime": time.time() - self.started,
+            "rss": last.get("rss"),
+            "rss_peak": peak,
+            "rss_limit": self.rss_limit,
+            "figures": last.get("figures"),
+            "requests": self.requests,
+            "max_requests": self.max_requests,
+            "active": self.active,
+            "tracemalloc": tracemalloc.is_tracing(),
+            "draining": self.draining,
+            "recycle_reason": self.recycle_reason,
+            "history": list(self.samples),
+        }
@@ -0,0 +1,141 @@
+"""Opt-in cProfile traces of individual requests.
+
+A request is profiled when either
+
+- it carries ``X-Profile: 1`` (or ``?profile=1``) together with the admin
+  token in ``X-Admin-Token`` (the token is never read from the query
+  string, which would leak it into access logs), or
+- sampling is enabled and it is the N-th request since the last sample.
+
+Each trace is written as a ``.prof`` file (loadable with ``pstats`` or
+snakeviz) into a directory that keeps only the newest ``max_files``
+traces. With no admin token and no sampling configured, the per-request
+cost is a single attribute check.
+"""
+import cProfile
+import hmac
+import io
+import itertools
+import os
+import pstats
+import re
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+
+_SAFE_NAME_RE = re.compile(r"^[\w-]+\.prof$")
+SORT_KEYS = ("cumulative", "tottime", "ncalls", "filename")
+
+
+class RequestProfiler:
+    """Decides which requests to profile and manages the trace directory.
+
+    Parameters
+    ----------
+    admin_token : str | None
+        Secret required to trigger profiling on demand and to download
+        traces. ``None`` disables on-demand profiling and the admin API.
+    sample_every : int
+        Profile every N-th request; ``0`` disables sampling.
+    directory : str | None
+        Where traces are written; defaults to a ``manus-profiles`` folder in
+        the system temp directory.
+    max_files : int
+        Number of most recent traces kept on disk.
+    """
+
+    def __init__(self, admin_token: str | None = None, sample_every: int = 0,
+                 directory: str | None = None, max_files: int = 50):
+        self.admin_token = admin_token or None
+        self.sample_every = max(0, sample_every)
+        self.directory = directory or os.path.join(tempfile.gettempdir(), "manus-profiles")
+        self.max_files = max_files
+        self.enabled = self.admin_token is not None or self.sample_every > 0
+        self._counter = itertools.count(1)
+        # cProfile cannot run two profilers at once on Python 3.12+
+        self._active = threading.Lock()
+
+    def authorized(self, request) -> bool:
+        if self.admin_token is None:
+            return False
+        # header only: query strings end up in access and proxy logs
+        supplied = request.headers.get("X-Admin-Token") or ""
+        return hmac.compare_digest(supplied.encode(), self.admin_token.encode())
+
+    def should_profile(self, request) -> bool:
+        if not self.enabled:
+            return False
+        if self.sample_every and next(self._counter) % self.sample_every == 0:
+            return True
+        flag = request.headers.get("X-Profile") or request.args.get("profile")
+        return flag not in (None, "", "0") and self.authorized(request)
+
+    @contextmanager
+    def profile(self, label: str):
+        """Profile the ``with`` body; yields a dict that receives ``name``.
+
+        If another request is already being profiled the body runs
+        unprofiled and ``name`` stays ``None``.
+        """
+        trace = {"name": None}
+        if not self._active.acquire(blocking=False):
+            yield trace
+            return
+        profiler = cProfile.Profile()
+        try:
+            profiler.enable()
+            try:
+                yield trace
+            finally:
+                profiler.disable()
+            trace["name"] = self._save(profiler, label)
+        finally:
+            self._active.release()
+
+    def _save(self, profiler, label: str) -> str:
+        os.makedirs(self.directory, exist_ok=True)
+        safe_label = re.sub(r"[^\w-]", "_", label)
+        name = f"{time.strftime('%Y%m%d-%H%M%S')}-{time.time_ns() % 10**9:09d}-{safe_label}.prof"
+        profiler.dump_stats(os.path.join(self.directory, name))
+        self._rotate()
+        return name
+
+    def _rotate(self) -> None:
+        traces = self.list()
+        for entry in traces[self.max_files:]:
+            try:
+                os.unlink(os.path.join(self.directory, entry["name"]))
+            except OSError:
+                pass
+
+    def list(self) -> list:
+        """Saved traces, newest first."""
+        if not os.path.isdir(self.directory):
+            return []
+        entries = []
+        for name in os.listdir(self.directory):
+            if _SAFE_NAME_RE.match(name):
+                st = os.stat(os.path.join(self.directory, name))
+                entries.append({"name": name, "size": st.st_size, "modified": st.st_mtime})
+        # names start with a sortable timestamp
+        entries.sort(key=lambda e: e["name"], reverse=True)
+        return entries
+
+    def path(self, name: str) -> str | None:
+        """Absolute path of a saved trace, or ``None`` for unknown/unsafe names."""
+        if not _SAFE_NAME_RE.match(name):
+            return None
+        path = os.path.join(self.directory, name)
+        return path if os.path.isfile(path) else None
+
+    def summary(self, name: str, limit: int = 40, sort: str = "cumulative") -> str | None:
+        """Plain-text ``pstats`` report of a saved trace."""
+        path = self.path(name)
+        if path is None:
+            return None
+        if sort not in SORT_KEYS:
+            sort = "cumulative"
+        out = io.StringIO()
+        pstats.Stats(path, stream=out).strip_dirs().sort_stats(sort).print_stats(limit)
+        return out.getvalue()
@@ -0,0 +1,239 @@
+"""Weighted fair scheduling and admission control for capability dispatch.
+
+Every ``/predict`` call asks the scheduler for an execution slot under the
+capability it routes to (see ``AIModel.route``). Each capability has its own
+queue with a weight, a maximum depth, a deadline and an optional cap on how
+many slots it may hold at once, so a burst of PDF or image generation can
+neither take every slot nor push cheap sentiment calls to the back of a
+single FIFO.
+
+Queued requests are served in start-time fair queuing order: a request's tag
+is ``max(virtual_time, last_tag[capability]) + 1 / weight`` and the free slot
+goes to the smallest tag whose capability is under its concurrency cap.
+
+Requests are refused up front rather than left to time out:
+
+- ``429`` when the capability's queue is full;
+- ``503`` when the estimated wait exceeds the capability's deadline, or the
+  deadline passes while still queued.
+
+Both carry a ``retry_after`` estimate in seconds.
+"""
+import math
+import os
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from dataclasses import dataclass
+
+
+@dataclass
+class CapabilityPolicy:
+    """Scheduling parameters for one capability.
+
+    ``deadline`` is the longest a request may wait in the queue (seconds);
+    ``max_concurrency`` caps the slots the capability may hold at once.
+    """
+    weight: float = 1.0
+    max_queue: int = 64
+    deadline: float = 10.0
+    max_concurrency: int | None = None
+
+
+DEFAULT_POLICIES = {
+    'text_analysis': CapabilityPolicy(weight=8.0, max_queue=256, deadline=2.0),
+    'prediction': CapabilityPolicy(weight=8.0, max_queue=256, deadline=2.0),
+    'content_creation': CapabilityPolicy(weight=4.0, max_queue=64, deadline=5.0),
+    'image_generation': CapabilityPolicy(weight=1.0, max_queue=16, deadline=30.0, max_concurrency=2),
+    'pdf_creation': CapabilityPolicy(weight=1.0, max_queue=16, deadline=30.0, max_concurrency=2),
+    # multi-MB documents: one at a time, behind everything else
+    'document_analysis': CapabilityPolicy(weight=0.5, max_queue=8, deadline=60.0, max_concurrency=1),
+}
+
+WAIT_SAMPLES = 1024
+
+
+class Rejected(Exception):
+    """Raised when a request is not admitted; carries the HTTP status to use."""
+
+    def __init__(self, capability: str, status: int, reason: str, retry_after: float):
+        super().__init__(f"{capability}: {reason}")
+        self.capability = capability
+        self.status = status
+        self.reason = reason
+        self.retry_after = max(1, math.ceil(retry_after))
+
+
+class _Ticket:
+    __slots__ = ("capability", "tag", "enqueued", "deadline", "granted", "started")
+
+    def __init__(self, capability, tag, enqueued, deadline):
+        self.capability = capability
+        self.tag = tag
+        self.enqueued = enqueued
+        self.deadline = deadline
+        self.granted = False
+        self.started = None
+
+
+class _CapabilityState:
+    def __init__(self, policy: CapabilityPolicy):
+        self.policy = policy
+        self.queue = deque()
+        self.in_flight = 0
+        self.last_tag = 0.0
+        self.service_time = None  # EWMA of seconds per request
+        self.waits = deque(maxlen=WAIT_SAMPLES)
+        self.admitted = 0
+        self.rejected_full = 0
+        self.rejected_deadline = 0
+        self.expired = 0
+
+
+class FairScheduler:
+    """Per-capability weighted fair queues in front of a fixed pool of slots.
+
+    Parameters
+    ----------
+    policies : dict | None
+        Capability name -> ``CapabilityPolicy``. Unknown capabilities get the
+        default policy. Defaults to ``DEFAULT_POLICIES``.
+    max_concurrency : int | None
+        Total number of requests executing at once; defaults to the CPU count.
+    """
+
+    def __init__(self, policies: dict | None = None, max_concurrency: int | None = None):
+        self.max_concurrency = max_concurrency or os.cpu_count() or 4
+        self._policies = dict(DEFAULT_POLICIES if policies is None else policies)
+        self._states = {}
+        self._in_flight = 0
+        self._vtime = 0.0
+        self._cond = threading.Condition()
+
+    def _state(self, capability: str) -> _CapabilityState:
+        state = self._states.get(capability)
+        if state is None:
+            state = _CapabilityState(self._policies.get(capability, CapabilityPolicy()))
+            self._states[capability] = state
+        return state
+
+    def _estimated_wait(self, state: _CapabilityState, position: int) -> float:
+        if state.service_time is None:
+            return 0.0
+        slots = min(state.policy.max_concurrency or self.max_concurrency, self.max_concurrency)
+        return state.service_time * position / slots
+
+    def _dispatch(self) -> int:
+        """Grant free slots to queued tickets, smallest tag first.
+
+        Returns the number of tickets granted.
+        """
+        granted = 0
+        while self._in_flight < self.max_concurrency:
+            best = None
+            for state in self._states.values():
+                if not state.queue:
+                    continue
+                cap = state.policy.max_concurrency
+                if cap is not None and state.in_flight >= cap:
+                    continue
+                if best is None or state.queue[0].tag < best.queue[0].tag:
+                    best = state
+            if best is None:
+                break
+            ticket = best.queue.popleft()
+            self._vtime = max(self._vtime, ticket.tag)
+            ticket.granted = True
+            ticket.started = time.monotonic()
+            best.in_flight += 1
+            best.admitted += 1
+            best.waits.append(ticket.started - ticket.enqueued)
+            self._in_flight += 1
+            granted += 1
+        return granted
+
+    def acquire(self, capability: str) -> _Ticket:
+        """Block until a slot is granted; raise ``Rejected`` otherwise."""
+        now = time.monotonic()
+        with self._cond:
+            state = self._state(capability)
+            policy = state.policy
+            if len(state.queue) >= policy.max_queue:
+                state.rejected_full += 1
+                raise Rejected(capability, 429, "queue full",
+                               self._estimated_wait(state, len(state.queue)))
+            wait = self._estimated_wait(state, len(state.queue) + 1) if state.queue else 0.0
+            if wait > policy.deadline:
+                state.rejected_deadline += 1
+                raise Rejected(capability, 503, "deadline cannot be met", wait)
+
+            tag = max(self._vtime, state.last_tag) + 1.0 / policy.weight
+            state.last_tag = tag
+            ticket = _Ticket(capability, tag, now, now + policy.deadline)
+            state.queue.append(ticket)
+            if self._dispatch() > int(ticket.granted):
+                self._cond.notify_all()
+
+            while not ticket.granted:
+                remaining = ticket.deadline - time.monotonic()
+                if remaining <= 0:
+                    state.queue.remove(ticket)
+                    state.expired += 1
+                    raise Rejected(capability, 503, "deadline exceeded while queued",
+                                   self._estimated_wait(state, len(state.queue) + 1))
+                self._cond.wait(remaining)
+            return ticket
+
+    def release(self, ticket: _Ticket) -> None:
+        elapsed = time.monotonic() - ticket.started
+        with self._cond:
+            state = self._states[ticket.capability]
+            state.in_flight -= 1
+            self._in_flight -= 1
+            if state.service_time is None:
+                state.service_time = elapsed
+            else:
+                state.service_time = 0.8 * state.service_time + 0.2 * elapsed
+            if self._dispatch():
+                self._cond.notify_all()
+
+    @contextmanager
+    def slot(self, capability: str):
+        """Run the ``with`` body once a slot for ``capability`` is granted."""
+        ticket = self.acquire(capability)
+        try:
+            yield ticket
+        finally:
+            self.release(ticket)
+
+    def stats(self) -> dict:
+        """Queue depth, wait-time percentiles and admission counters."""
+        with self._cond:
+            capabilities = {}
+            for name, state in self._states.items():
+                waits = sorted(state.waits)
+                capabilities[name] = {
+                    "weight": state.policy.weight,
+                    "queued": len(state.queue),
+                    "max_queue": state.policy.max_queue,
+                    "in_flight": state.in_flight,
+                    "admitted": state.admitted,
+                    "rejected_full": state.rejected_full,
+                    "rejected_deadline": state.rejected_deadline,
+                    "expired": state.expired,
+                    "wait_ms_p50": _percentile(waits, 0.50) * 1000,
+                    "wait_ms_p99": _percentile(waits, 0.99) * 1000,
+                    "service_ms": (state.service_time or 0.0) * 1000,
+                }
+            return {
+                "max_concurrency": self.max_concurrency,
+                "in_flight": self._in_flight,
+                "capabilities": capabilities,
+            }
+
+
+def _percentile(sorted_values, q: float) -> float:
+    if not sorted_values:
+        return 0.0
+    return sorted_values[min(len(sorted_values) - 1, int(q * len(sorted_values)))]
@@ -0,0 +1,127 @@
+"""Pre-fork supervisor that keeps a fixed number of server workers alive.
+
+The supervisor binds the listening socket once and starts ``workers`` child
+processes that all accept connections on it (the socket is inherited by file
+descriptor). A worker that decides to recycle stops accepting, lets its
+in-flight requests finish and exits with ``RECYCLE_EXIT_CODE``; the
+supervisor then starts a replacement. Connections arriving meanwhile wait in
+the socket backlog or are picked up by the other workers, so none are
+refused. Workers that crash are replaced too.
+
+A worker that exits (recycled or crashed) within ``MIN_UPTIME_SECONDS`` of
+starting is restarted after an exponential back-off, capped at
+``MAX_BACKOFF_SECONDS``. This stops a tight train/exit/respawn loop, e.g.
+when the RSS right after startup is already above ``--max-rss-mb``. The
+back-off resets once a worker stays up long enough.
+
+Unix only (relies on ``pass_fds``).
+"""
+import signal
+import socket
+import subprocess
+import time
+
+RECYCLE_EXIT_CODE = 75  # EX_TEMPFAIL
+WORKER_FD_FLAG = "--worker-fd"
+CRASH_BACKOFF_SECONDS = 1.0
+MIN_UPTIME_SECONDS = 30.0
+MAX_BACKOFF_SECONDS = 60.0
+
+
+def bind_socket(host: str, port: int, backlog: int = 128) -> socket.socket:
+    family = socket.AF_INET6 if ":" in host else socket.AF_INET
+    sock = socket.socket(family, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind((host, port))
+    sock.listen(backlog)
+    sock.set_inheritable(True)
+    return sock
+
+
+class Supervisor:
+    """Runs ``command + [WORKER_FD_FLAG, fd]`` ``workers`` times and replaces exits.
+
+    Parameters
+    ----------
+    command : list of str
+        Worker command line, e.g. ``[sys.executable, "server.py", ...]``.
+    host, port : str, int
+        Address of the shared listening socket.
+    workers : int
+        Number of worker processes kept running.
+    log : callable
+        Receives one-line status messages.
+    """
+
+    def __init__(self, command: list, host: str, port: int, workers: int = 1, log=print):
+        self.command = list(command)
+        self.log = log
+        self.host = host
+        self.port = port
+        self.workers = max(1, workers)
+        self.children = {}
+        self.recycled = 0
+        self._started = {}
+        self._respawn_at = []
+        self._backoff = 0.0
+        self._stopping = False
+
+    def _spawn(self, fd: int) -> None:
+        proc = subprocess.Popen(self.command + [WORKER_FD_FLAG, str(fd)], pass_fds=(fd,))
+        self.children[proc.pid] = proc
+        self._started[proc.pid] = time.monotonic()
+        self.log(f"Started worker pid {proc.pid}")
+
+    def restart_delay(self, code: int, uptime: float) -> float:
+        """Seconds to wait before replacing a worker that exited with ``code``."""
+        if uptime < MIN_UPTIME_SECONDS:
+            self._backoff = min(MAX_BACKOFF_SECONDS, max(CRASH_BACKOFF_SECONDS, self._backoff * 2))
+            return self._backoff
+        self._backoff = 0.0
+        return 0.0 if code == RECYCLE_EXIT_CODE else CRASH_BACKOFF_SECONDS
+
+    def _stop(self, signum, frame) -> None:
+        self._stopping = True
+
+    def run(self) -> None:
+        """Supervise until SIGINT/SIGTERM, then terminate the workers."""
+        sock = bind_socket(self.host, self.port)
+        fd = sock.fileno()
+        signal.signal(signal.SIGTERM, self._stop)
+        signal.signal(signal.SIGINT, self._stop)
+        try:
+            for _ in range(self.workers):
+                self._spawn(fd)
+            while not self._stopping:
+                time.sleep(0.2)
+                for pid, proc in list(self.children.items()):
+                    code = proc.poll()
+                    if code is None:
+                        continue
+                    del self.children[pid]
+                    if self._stopping:
+                        break
+                    uptime = time.monotonic() - self._started.pop(pid)
+                    delay = self.restart_delay(code, uptime)
+                    if code == RECYCLE_EXIT_CODE:
+                        self.recycled += 1
+                        what = f"recycled after {uptime:.1f}s"
+                    else:
+                        what = f"exited with code {code} after {uptime:.1f}s"
+                    self.log(f"Worker pid {pid} {what}; replacing in {delay:.1f}s")
+                    self._respawn_at.append(time.monotonic() + delay)
+                now = time.monotonic()
+                due = [t for t in self._respawn_at if t <= now]
+                if due and not self._stopping:
+                    self._respawn_at = [t for t in self._respawn_at if t > now]
+                    for _ in due:
+                        self._spawn(fd)
+        finally:
+            for proc in self.children.values():
+                proc.terminate()
+            for proc in self.children.values():
+                try:
+                    proc.wait(timeout=10)
+                except subprocess.TimeoutExpired:
+                    proc.kill()
+            sock.close()
@@ -1,5 +1,6 @@
 import os
 import pandas as pd
+from pandas.api.types import is_numeric_dtype
 from sklearn.datasets import make_classification
 from urllib.parse import urlparse
 
@@ -13,9 +14,10 @@ class Dataset:
     - Local Parquet files (.parquet)
     - Remote CSV/JSON via http(s) URLs
 
-    Expected schema (recommended): a table where feature columns are numeric and
-    the target column is named 'target'. If 'target' is missing, training code
-    will create a default target (zeros) but results may be meaningless.
+    Expected schema (recommended): a table with numeric, categorical and/or
+    free-text feature columns and a target column named 'target'. If 'target'
+    is missing, training code will create a default target (zeros) but results
+    may be meaningless.
     """
 
     def __init__(self, file_path: str | None = None):
@@ -91,7 +93,9 @@ class Dataset:
             raise ValueError("No data available to preprocess")
 
         df = df.copy()
-        df.fillna(0, inplace=True)
+        # numeric gaps become 0, missing text/categories become empty strings
+        fill = {name: 0 if is_numeric_dtype(df[name]) else "" for name in df.columns}
+        df.fillna(fill, inplace=True)
 
         if target_column not in df.columns:
             # Create a default target (all zeros) if missing — caller should replace with real target
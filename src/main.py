@@ -1,6 +1,12 @@
 import os
+import sys
+import json
 import argparse
+from ai.bulk import DEFAULT_CAPABILITY, DEFAULT_CHUNK_SIZE, open_input, read_csv, read_jsonl, score_stream
+from ai.features import needs_feature_pipeline
 from ai.model import AIModel
+from ai.report import build_report, dataset_sections
+from ai.tuning import DEFAULT_GRID, tune
 from data.dataset import Dataset
 from utils.helpers import log_message
 
@@ -34,11 +40,106 @@ def run_train(data_path: str | None, non_interactive: bool):
             log_message(f"Error during prediction: {e}")
 
 
+def run_predict(data_path: str | None, input_path: str, output_path: str, input_format: str | None,
+                workers: int | None, chunk_size: int, model_path: str | None = None,
+                capability: str | None = DEFAULT_CAPABILITY):
+    # Keep stdout clean for results when writing to it
+    log_file = sys.stderr if output_path == "-" else None
+
+    def log(message):
+        log_message(message, file=log_file)
+
+    if model_path:
+        # e.g. the artifact written by `main.py tune`; no retraining per run
+        model = AIModel.load(model_path)
+        log(f"Loaded model from {model_path}.")
+    else:
+        log("Initializing training...")
+        dataset = Dataset(data_path)
+        X, y = dataset.preprocess_data(dataset.load_data())
+        model = AIModel()
+        if needs_feature_pipeline(X):
+            # mixed-type rows are scored as DataFrames through the same feature pipeline
+            model.train_model(X, y.to_numpy())
+        else:
+            # numeric records arrive as bare matrices, so fit without DataFrame column names
+            model.train_model(X.to_numpy(dtype=float), y.to_numpy())
+        log("Training complete.")
+
+    if input_format is None:
+        input_format = "csv" if input_path.lower().endswith(".csv") else "jsonl"
+    output_format = "csv" if output_path.lower().endswith(".csv") else "jsonl"
+    workers = workers or os.cpu_count() or 1
+    reader = read_csv if input_format == "csv" else read_jsonl
+
+    with open_input(input_path) as src:
+        out = sys.stdout if output_path == "-" else open(output_path, "w", encoding="utf-8", newline="")
+        try:
+            stats = score_stream(model, reader(src, chunk_size), out, fmt=output_format,
+                                 workers=workers, progress=log, capability=capability)
+        finally:
+            if out is not sys.stdout:
+                out.close()
+    log(f"Scored {stats['records']} records in {stats['seconds']:.2f}s "
+        f"({stats['records_per_second']:.0f} records/s, {workers} workers)")
+
+
+def run_report(data_path: str | None, output: str, workers: int | None):
+    log_message("Loading dataset for report...")
+    dataset = Dataset(data_path)
+    df = dataset.load_data()
+    title = f"Dataset Report: {os.path.basename(data_path) if data_path else 'synthetic data'}"
+    info = build_report(dataset_sections(df), output, title=title, workers=workers)
+    log_message(f"Wrote {info['pages']} pages ({info['sections']} sections, {info['charts']} charts) to {output}")
+
+
+def run_tune(data_path: str | None, output: str, workers: int | None, folds: int, eta: int,
+             grid: str | None, max_latency_ms: float | None):
+    log_message("Loading dataset for tuning...")
+    dataset = Dataset(data_path)
+    X, y = dataset.preprocess_data(dataset.load_data())
+    model, report = tune(X, y, grid=json.loads(grid) if grid else DEFAULT_GRID, n_folds=folds,
+                         eta=eta, workers=workers, max_latency_ms=max_latency_ms, progress=log_message)
+
+    model.save(output)
+    report_path = os.path.splitext(output)[0] + "_report.json"
+    with open(report_path, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+
+    log_message(f"{'id':>4} {'accuracy':>9} {'latency ms':>11} {'batch us/row':>13}  params")
+    for result in report["results"]:
+        if "latency_ms" not in result:
+            continue
+        score = "n/a" if result["score"] is None else f"{result['score']:.4f}"
+        log_message(f"{result['id']:>4} {score:>9} {result['latency_ms']:>11.3f} "
+                    f"{result['batch_us_per_row']:>13.2f}  {json.dumps({**result['features'], **result['model']})}")
+    if not report["within_budget"]:
+        log_message(f"No finalist meets {max_latency_ms} ms; picked the fastest")
+    log_message(f"Winner: candidate {report['winner']}. Model written to {output}, report to {report_path}")
+
+
 def main(argv: list | None = None):
     parser = argparse.ArgumentParser(description="Manus AI CLI")
-    parser.add_argument("mode", choices=["train", "serve", "evaluate"], default="train", nargs="?")
+    parser.add_argument("mode", choices=["train", "serve", "evaluate", "report", "predict", "tune"], default="train", nargs="?")
     parser.add_argument("--data", "-d", dest="data_path", help="Path or URL to dataset (csv/json/parquet)")
     parser.add_argument("--no-interactive", dest="no_interactive", action="store_true", help="Run non-interactive (train only)")
+    parser.add_argument("--input", "-i", dest="input_path", default="-", help="Records to score in predict mode (JSONL/CSV, '-' for stdin)")
+    parser.add_argument("--input-format", choices=["jsonl", "csv"], default=None, help="Input format for predict mode (default: from extension)")
+    parser.add_argument("--output", "-o", default=None,
+                        help="Output path (report mode: report.pdf; predict mode: '-' for stdout; tune mode: model.pkl)")
+    parser.add_argument("--model", dest="model_path", default=None,
+                        help="Saved model to score with in predict mode (e.g. from tune) instead of training")
+    parser.add_argument("--capability", default=DEFAULT_CAPABILITY,
+                        choices=["text_analysis", "content_creation", "image_generation", "pdf_creation", "auto"],
+                        help="Capability for text records in predict mode ('auto': route on keywords like /predict)")
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE, help="Records per chunk in predict mode")
+    parser.add_argument("--workers", type=int, default=None, help="Worker processes for parallel modes (default: CPU count)")
+    parser.add_argument("--folds", type=int, default=3, help="Cross-validation folds in tune mode")
+    parser.add_argument("--eta", type=int, default=3, help="Halving factor in tune mode (keep the best 1/eta per rung)")
+    parser.add_argument("--grid", default=None,
+                        help='Tune search space as JSON, e.g. \'{"model": {"C": [0.1, 1]}, "features": {"max_text_features": [100]}}\'')
+    parser.add_argument("--max-latency-ms", type=float, default=None,
+                        help="Single-row latency budget for picking the tuned model")
     args = parser.parse_args(argv)
 
     if args.mode == "train":
@@ -57,6 +158,15 @@ def main(argv: list | None = None):
         project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
         Popen(cmd, cwd=project_root)
         log_message('Server started (subprocess).')
+    elif args.mode == "report":
+        run_report(args.data_path, args.output or "report.pdf", args.workers)
+    elif args.mode == "predict":
+        run_predict(args.data_path, args.input_path, args.output or "-", args.input_format,
+                    args.workers, args.chunk_size, args.model_path,
+                    None if args.capability == "auto" else args.capability)
+    elif args.mode == "tune":
+        run_tune(args.data_path, args.output or "model.pkl", args.workers, args.folds, args.eta,
+                 args.grid, args.max_latency_ms)
     else:
         log_message(f"Mode '{args.mode}' is not yet implemented. Use 'train' for now.")
 
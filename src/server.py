@@ -1,105 +1,510 @@
-from flask import Flask, request, jsonify, redirect, send_file
+from flask import Flask, Response, request, jsonify, redirect, send_file
 from flask_cors import CORS
+from werkzeug.exceptions import RequestEntityTooLarge
+from werkzeug.serving import make_server
 import argparse
+import sys
 import threading
 import time
 import base64
 import tempfile
 import os
 
+from ai.cache import ResultCache
+from ai.context import RequestContext, as_context
+from ai.longdoc import DEFAULT_BATCH_SIZE, DEFAULT_SEGMENT_CHARS, DocumentPool
 from ai.model import AIModel
+from api.encoding import (JSON_TYPE, available_types, compress, encode, parse_fields,
+                          parse_flag, shape_result)
+from api.httpcache import REVALIDATE_CACHE_CONTROL, StaticResponse, add_validators
+from api.ingest import (DEFAULT_MAX_BODY_BYTES, NPY_TYPES, BodyTooLarge, UnsupportedFormat,
+                        encode_npy, is_binary_type, parse_features, read_body)
+from api.jobs import FINAL_STATES, SUCCEEDED, JobManager, JobQueueFull
+from api.memory import STAT_KEYS, MemoryWatchdog
+from api.profiling import RequestProfiler
+from api.scheduler import FairScheduler, Rejected
+from api.supervisor import RECYCLE_EXIT_CODE, WORKER_FD_FLAG, Supervisor
 from data.dataset import Dataset
 from utils.helpers import log_message
 
+JOB_RETRY_AFTER = 5
+JOB_ADMISSION_TIMEOUT = 300.0
+MAX_LONG_POLL_SECONDS = 60.0
+DEFAULT_DRAIN_TIMEOUT = 30.0
 
-def create_app(model_container: dict):
+INDEX = {
+    "status": "Manus AI - Next-Generation AI Platform",
+    "developer": "Marwen Rabai",
+    "website": "https://marwen-rabai.netlify.app",
+    "capabilities": [
+        "Image Generation",
+        "PDF Creation",
+        "Text Analysis",
+        "Content Creation"
+    ]
+}
+
+HEALTH_CAPABILITIES = {
+    "image_generation": True,
+    "pdf_creation": True,
+    "text_analysis": True,
+    "content_creation": True
+}
+
+CAPABILITIES = {
+    "capabilities": {
+        "image_generation": {
+            "enabled": True,
+            "description": "Generate visual content from text descriptions",
+            "examples": [
+                "Generate an image of a futuristic city",
+                "Create a visualization of AI concepts",
+                "Draw a nature-inspired pattern"
+            ]
+        },
+        "pdf_creation": {
+            "enabled": True,
+            "description": "Create professional PDF documents and reports",
+            "examples": [
+                "Create a PDF report about AI trends",
+                "Generate a business analysis document",
+                "Make a technical specification PDF"
+            ]
+        },
+        "text_analysis": {
+            "enabled": True,
+            "description": "Analyze text sentiment and extract insights",
+            "examples": [
+                "Analyze sentiment: I love this product!",
+                "Extract key insights from text",
+                "Determine emotional tone of content"
+            ]
+        },
+        "content_creation": {
+            "enabled": True,
+            "description": "Generate creative stories and articles",
+            "examples": [
+                "Write a story about AI friendship",
+                "Create an article about technology trends",
+                "Generate creative content about robots"
+            ]
+        }
+    },
+    "developer": {
+        "name": "Marwen Rabai",
+        "website": "https://marwen-rabai.netlify.app",
+        "description": "Next-Generation AI Platform Developer"
+    }
+}
+
+MIN_SEGMENT_CHARS = 200
+
+
+def create_app(model_container: dict, max_body_bytes: int = DEFAULT_MAX_BODY_BYTES,
+               scheduler: FairScheduler | None = None, jobs: JobManager | None = None,
+               profiler: RequestProfiler | None = None, watchdog: MemoryWatchdog | None = None,
+               document_workers: int | None = None):
     # static files are located in the 'static' folder next to this file
     import pathlib
     static_path = str(pathlib.Path(__file__).resolve().parent / 'static')
     app = Flask(__name__, static_folder=static_path)
+    app.config["MAX_CONTENT_LENGTH"] = max_body_bytes
     CORS(app)
+    # Admission control and weighted fair queuing per capability
+    if scheduler is None:
+        scheduler = FairScheduler()
+    # Background workers for long-running generation submitted via /jobs;
+    # their threads only start with the first submitted job
+    if jobs is None:
+        jobs = JobManager()
+    # Opt-in per-request cProfile traces (disabled unless configured)
+    if profiler is None:
+        profiler = RequestProfiler()
+    # RSS / open-figure sampling and request counting for worker recycling
+    if watchdog is None:
+        watchdog = MemoryWatchdog()
+    # One set of scoring processes for every /analyze/document request,
+    # started on first use; with a single worker documents are scored inline
+    document_workers = document_workers or os.cpu_count() or 1
+    document_pool = DocumentPool(document_workers) if document_workers > 1 else None
+
+    @app.before_request
+    def count_request():
+        watchdog.request_started()
+
+    @app.teardown_request
+    def finish_request(exc):
+        watchdog.request_finished()
+
+    # Bodies that never change are serialized (and compressed) once
+    index_response = StaticResponse(encode(INDEX, JSON_TYPE), JSON_TYPE)
+    capabilities_response = StaticResponse(encode(CAPABILITIES, JSON_TYPE), JSON_TYPE)
+    with open(os.path.join(static_path, 'ui.html'), 'rb') as f:
+        # HTML changes on deploy, so clients revalidate it every time
+        ui_response = StaticResponse(f.read(), 'text/html', REVALIDATE_CACHE_CONTROL)
 
     # Serve a premium static UI at /ui (no npm required)
     @app.route('/ui', methods=['GET'])
     def ui():
-        # redirect to the static path, which Flask will serve from static_folder
+        # redirect to the static path, served from memory below
         return redirect('/static/ui.html')
 
+    @app.route('/static/ui.html', methods=['GET'])
+    def ui_html():
+        return ui_response(request)
+
     @app.route("/health", methods=["GET"])
     def health():
-        return jsonify({
+        model = model_container.get("model")
+        body = {
             "status": "ok",
-            "capabilities": {
-                "image_generation": True,
-                "pdf_creation": True,
-                "text_analysis": True,
-                "content_creation": True
-            },
-            "model_ready": model_container.get("model") is not None
-        }), 200
+            "capabilities": HEALTH_CAPABILITIES,
+            "model_ready": model is not None
+        }
+        if model is not None:
+            body["model_version"] = model.model_version
+            body["result_cache"] = model.result_cache.stats()
+        memory = watchdog.stats()
+        body["memory"] = {key: memory[key] for key in ("pid", "rss", "figures", "requests", "draining")}
+        if watchdog.draining:
+            # tell load balancers to stop routing here while in-flight work finishes
+            body["status"] = "draining"
+            return jsonify(body), 503
+        # RSS and cache counters change on every call: never serve a stored copy
+        resp = jsonify(body)
+        resp.headers["Cache-Control"] = "no-store"
+        return resp
 
     @app.route("/", methods=["GET"])
     def index():
-        return jsonify({
-            "status": "Manus AI - Next-Generation AI Platform",
-            "developer": "Marwen Rabai",
-            "website": "https://marwen-rabai.netlify.app",
-            "capabilities": [
-                "Image Generation",
-                "PDF Creation", 
-                "Text Analysis",
-                "Content Creation"
-            ]
-        }), 200
+        return index_response(request)
+
+    def respond(body, status: int = 200, cache_control: str | None = None):
+        """Shape, encode and compress a /predict result per the request options.
+
+        Options come from the query string or, for JSON requests, the payload:
+        ``fields`` (keys to keep on success) and ``echo`` (``0`` drops the
+        echoed input). The encoding follows ``Accept`` and ``Accept-Encoding``.
+        With ``cache_control`` (finished jobs), a successful response gets a
+        content-hash ``ETag`` and a matching ``If-None-Match`` is answered
+        with 304. POST /predict responses get no validator: a 304 is only
+        ever sent for GET.
+        """
+        payload = request.get_json(force=True, silent=True) if not is_binary_type(request.mimetype) else None
+        if not isinstance(payload, dict):
+            payload = {}
+        fields = parse_fields(request.args.get("fields", payload.get("fields")))
+        echo = parse_flag(request.args.get("echo", payload.get("echo")))
+        body = shape_result(body, fields if status < 400 else None, echo)
+
+        mimetype = request.accept_mimetypes.best_match(available_types(), default=JSON_TYPE)
+        data, content_encoding = compress(encode(body, mimetype), request.accept_encodings)
+        resp = Response(data, status=status, mimetype=mimetype)
+        if content_encoding:
+            resp.headers["Content-Encoding"] = content_encoding
+        resp.vary.update(("Accept", "Accept-Encoding"))
+        if cache_control and status == 200:
+            return add_validators(resp, request, cache_control)
+        return resp
+
+    def reject(e: Rejected):
+        resp = respond({
+            "type": "error",
+            "error": e.reason,
+            "capability": e.capability,
+            "retry_after": e.retry_after
+        }, e.status)
+        resp.headers["Retry-After"] = str(e.retry_after)
+        return resp
+
+    def predict_binary():
+        """Score a .npy / Arrow IPC feature matrix without going through JSON."""
+        model = model_container.get("model")
+        if model is None:
+            return respond({"error": "model not ready"}, 503)
+
+        try:
+            body = read_body(request.stream, request.content_length, max_body_bytes)
+            features = parse_features(body, request.mimetype)
+        except (BodyTooLarge, RequestEntityTooLarge) as e:
+            return respond({"error": str(e)}, 413)
+        except UnsupportedFormat as e:
+            return respond({"error": str(e)}, 415)
+        except Exception as e:
+            return respond({"error": f"invalid binary payload: {e}"}, 400)
+
+        try:
+            with scheduler.slot('prediction'):
+                pred = model.predict(features)
+        except Rejected as e:
+            return reject(e)
+        except Exception as e:
+            return respond({
+                "type": "error",
+                "error": str(e),
+                "rows": int(features.shape[0])
+            }, 500)
+
+        if request.accept_mimetypes.best_match(["application/json", *NPY_TYPES]) in NPY_TYPES:
+            return Response(encode_npy(pred), mimetype=NPY_TYPES[0])
+        return respond({
+            "type": "prediction",
+            "prediction": pred.tolist(),
+            "rows": int(features.shape[0])
+        }, 200)
 
     @app.route("/predict", methods=["POST"])
     def predict():
+        if profiler.should_profile(request):
+            with profiler.profile("predict") as trace:
+                resp = handle_predict()
+            if trace["name"]:
+                resp.headers["X-Profile-Id"] = trace["name"]
+            return resp
+        return handle_predict()
+
+    def handle_predict():
+        if is_binary_type(request.mimetype):
+            return predict_binary()
+
         payload = request.get_json(force=True)
         if payload is None:
-            return jsonify({"error": "invalid json"}), 400
+            return respond({"error": "invalid json"}, 400)
 
         model = model_container.get("model")
         if model is None:
-            return jsonify({"error": "model not ready"}), 503
+            return respond({"error": "model not ready"}, 503)
 
         if "input" in payload:
+            # derived once and shared by routing and the capability
+            ctx = as_context(payload["input"])
             try:
-                result = model.predict(payload["input"])
+                with scheduler.slot(model.route(ctx)):
+                    result = model.predict(ctx)
                 
                 # Handle different types of results
                 if isinstance(result, dict) and result.get('type') in ['image', 'pdf', 'content', 'sentiment']:
-                    return jsonify(result), 200
+                    resp = respond(result, 200)
                 else:
                     # Fallback for simple predictions
-                    return jsonify({
+                    resp = respond({
                         "type": "prediction",
                         "prediction": int(result),
                         "input": payload["input"]
-                    }), 200
+                    }, 200)
+                if isinstance(ctx, RequestContext) and ctx.timings:
+                    resp.headers["Server-Timing"] = ", ".join(
+                        f"{stage};dur={seconds * 1e3:.1f}" for stage, seconds in ctx.timings.items())
+                return resp
                     
+            except Rejected as e:
+                return reject(e)
             except Exception as e:
-                return jsonify({
+                return respond({
                     "type": "error",
                     "error": str(e),
                     "input": payload["input"]
-                }), 500
+                }, 500)
 
         if "features" in payload:
             try:
-                pred = model.predict(payload["features"])
-                return jsonify({
+                with scheduler.slot('prediction'):
+                    pred = model.predict(payload["features"])
+                return respond({
                     "type": "prediction",
-                    "prediction": [int(x) for x in pred.tolist()],
+                    "prediction": pred.astype(int).tolist(),
                     "features": payload["features"]
-                }), 200
+                }, 200)
+            except Rejected as e:
+                return reject(e)
             except Exception as e:
-                return jsonify({
+                return respond({
                     "type": "error",
                     "error": str(e),
                     "features": payload["features"]
-                }), 500
+                }, 500)
+
+        return respond({"error": "no input provided"}, 400)
+
+    @app.route("/analyze/document", methods=["POST"])
+    def analyze_document():
+        """Per-segment sentiment of a long document, read from the body as a stream.
+
+        The body is ``text/plain`` (or JSON ``{"text": ...}``). Query options:
+        ``segment_chars``, ``batch_size`` and ``segments=0`` to return only
+        the aggregate.
+        """
+        model = model_container.get("model")
+        if model is None:
+            return respond({"error": "model not ready"}, 503)
+        try:
+            segment_chars = int(request.args.get("segment_chars", DEFAULT_SEGMENT_CHARS))
+            batch_size = int(request.args.get("batch_size", DEFAULT_BATCH_SIZE))
+        except ValueError:
+            return respond({"error": "segment_chars and batch_size must be integers"}, 400)
+        if segment_chars < MIN_SEGMENT_CHARS or batch_size < 1:
+            return respond({"error": f"segment_chars must be at least {MIN_SEGMENT_CHARS} "
+                                     "and batch_size at least 1"}, 400)
+
+        if request.mimetype == "application/json":
+            payload = request.get_json(silent=True)
+            if not isinstance(payload, dict) or not isinstance(payload.get("text"), str):
+                return respond({"error": "expected {\"text\": ...}"}, 400)
+            source = payload["text"]
+        else:
+            source = request.stream
+        try:
+            with scheduler.slot('document_analysis'):
+                result = model.analyze_document(
+                    source, segment_chars=segment_chars, batch_size=batch_size, pool=document_pool,
+                    include_segments=parse_flag(request.args.get("segments")))
+        except Rejected as e:
+            return reject(e)
+        except RequestEntityTooLarge as e:
+            return respond({"error": str(e)}, 413)
+        except Exception as e:
+            return respond({"type": "error", "error": str(e)}, 500)
+        return respond(result)
+
+    @app.route("/metrics", methods=["GET"])
+    def metrics():
+        """Scheduler queue depths, wait times, admission counters and memory samples"""
+        return jsonify({"scheduler": scheduler.stats(), "jobs": jobs.stats(),
+                        "memory": watchdog.stats()}), 200
+
+    def job_body(job):
+        body = job.to_dict()
+        body["status_url"] = f"/jobs/{job.id}"
+        if job.status == SUCCEEDED:
+            result = job.result
+            if isinstance(result, dict) and result.get("type") in ("pdf", "image") and "data" in result:
+                body["artifact_url"] = f"/jobs/{job.id}/artifact"
+                if not parse_flag(request.args.get("inline"), default=False):
+                    result = {k: v for k, v in result.items() if k != "data"}
+            body["result"] = result
+        return body
+
+    @app.route("/jobs", methods=["POST"])
+    def submit_job():
+        """Queue a generation request and return its job id immediately"""
+        payload = request.get_json(force=True, silent=True)
+        if not isinstance(payload, dict) or "input" not in payload:
+            return jsonify({"error": "no input provided"}), 400
 
-        return jsonify({"error": "no input provided"}), 400
+        model = model_container.get("model")
+        if model is None:
+            return jsonify({"error": "model not ready"}), 503
+
+        input_data = as_context(payload["input"])
+        capability = model.route(input_data)
+
+        def run():
+            # Jobs share the scheduler's slots with /predict. A rejected job
+            # has no client waiting on it, so it retries instead of failing
+            deadline = time.monotonic() + JOB_ADMISSION_TIMEOUT
+            while True:
+                try:
+                    with scheduler.slot(capability):
+                        result = model.predict(input_data)
+                    break
+                except Rejected as e:
+                    if time.monotonic() + e.retry_after > deadline:
+                        raise
+                    time.sleep(e.retry_after)
+            if isinstance(result, dict) and result.get("type") == "error":
+                raise RuntimeError(result["error"])
+            return result
+
+        try:
+            job = jobs.submit(run, capability=capability)
+        except JobQueueFull as e:
+            resp = jsonify({"type": "error", "error": str(e), "retry_after": JOB_RETRY_AFTER})
+            resp.headers["Retry-After"] = str(JOB_RETRY_AFTER)
+            return resp, 429
+
+        resp = jsonify(job_body(job))
+        resp.headers["Location"] = f"/jobs/{job.id}"
+        return resp, 202
+
+    @app.route("/jobs/<job_id>", methods=["GET"])
+    def get_job(job_id):
+        """Job status; ?wait=<seconds> long-polls until the job finishes"""
+        job = jobs.get(job_id)
+        if job is None:
+            return jsonify({"error": "job not found"}), 404
+        try:
+            wait = min(float(request.args.get("wait", 0)), MAX_LONG_POLL_SECONDS)
+        except ValueError:
+            return jsonify({"error": "wait must be a number of seconds"}), 400
+        if wait > 0 and job.status not in FINAL_STATES:
+            job.wait(wait)
+        # a finished job never changes again, so pollers can revalidate cheaply
+        final = job.status in FINAL_STATES
+        return respond(job_body(job), cache_control="private, no-cache" if final else None)
+
+    @app.route("/jobs/<job_id>", methods=["DELETE"])
+    def cancel_job(job_id):
+        """Cancel a queued or running job"""
+        job = jobs.cancel(job_id)
+        if job is None:
+            return jsonify({"error": "job not found"}), 404
+        return jsonify(job_body(job)), 200
+
+    @app.route("/jobs/<job_id>/artifact", methods=["GET"])
+    def job_artifact(job_id):
+        """Download the PDF or image produced by a finished job"""
+        job = jobs.get(job_id)
+        if job is None or job.status != SUCCEEDED:
+            return jsonify({"error": "artifact not available"}), 404
+        result = job.result
+        if not isinstance(result, dict) or "data" not in result:
+            return jsonify({"error": "job produced no artifact"}), 404
+        fmt = result.get("format", "bin")
+        filename = result.get("filename") or f"{job.id}.{fmt}"
+        mimetype = "application/pdf" if fmt == "pdf" else f"image/{fmt}"
+        resp = Response(base64.b64decode(result["data"]), mimetype=mimetype)
+        resp.headers["Content-Disposition"] = f'attachment; filename="{filename}"'
+        # the artifact of a job id never changes; it lives as long as the job
+        return add_validators(resp, request, f"private, max-age={int(jobs.ttl)}, immutable")
+
+    @app.route("/admin/profiles", methods=["GET"])
+    def list_profiles():
+        """List saved request profiles (requires the admin token)"""
+        if not profiler.authorized(request):
+            return jsonify({"error": "forbidden"}), 403
+        return jsonify({"profiles": profiler.list(), "sample_every": profiler.sample_every}), 200
+
+    @app.route("/admin/profiles/<name>", methods=["GET"])
+    def get_profile(name):
+        """Download a .prof trace, or ?format=text for a pstats summary"""
+        if not profiler.authorized(request):
+            return jsonify({"error": "forbidden"}), 403
+        path = profiler.path(name)
+        if path is None:
+            return jsonify({"error": "profile not found"}), 404
+        if request.args.get("format") == "text":
+            text = profiler.summary(name, sort=request.args.get("sort", "cumulative"))
+            return Response(text, mimetype="text/plain")
+        return send_file(path, as_attachment=True, download_name=name)
+
+    @app.route("/admin/memory", methods=["GET"])
+    def memory_report():
+        """Fresh memory sample plus tracemalloc top allocators (?limit=, ?key=)"""
+        if not profiler.authorized(request):
+            return jsonify({"error": "forbidden"}), 403
+        try:
+            limit = int(request.args.get("limit", 20))
+        except ValueError:
+            return jsonify({"error": "limit must be an integer"}), 400
+        key = request.args.get("key", "lineno")
+        if key not in STAT_KEYS:
+            return jsonify({"error": f"key must be one of {list(STAT_KEYS)}"}), 400
+        watchdog.sample()
+        top = watchdog.top_allocations(limit, key)
+        body = {"memory": watchdog.stats(), "top_allocations": top}
+        if top is None:
+            body["hint"] = "start the server with --tracemalloc-frames N to record allocations"
+        return jsonify(body), 200
 
     @app.route("/download/<file_type>/<filename>", methods=["GET"])
     def download_file(file_type, filename):
@@ -122,78 +527,91 @@ def create_app(model_container: dict):
     @app.route("/capabilities", methods=["GET"])
     def get_capabilities():
         """Get available AI capabilities"""
-        return jsonify({
-            "capabilities": {
-                "image_generation": {
-                    "enabled": True,
-                    "description": "Generate visual content from text descriptions",
-                    "examples": [
-                        "Generate an image of a futuristic city",
-                        "Create a visualization of AI concepts",
-                        "Draw a nature-inspired pattern"
-                    ]
-                },
-                "pdf_creation": {
-                    "enabled": True,
-                    "description": "Create professional PDF documents and reports",
-                    "examples": [
-                        "Create a PDF report about AI trends",
-                        "Generate a business analysis document",
-                        "Make a technical specification PDF"
-                    ]
-                },
-                "text_analysis": {
-                    "enabled": True,
-                    "description": "Analyze text sentiment and extract insights",
-                    "examples": [
-                        "Analyze sentiment: I love this product!",
-                        "Extract key insights from text",
-                        "Determine emotional tone of content"
-                    ]
-                },
-                "content_creation": {
-                    "enabled": True,
-                    "description": "Generate creative stories and articles",
-                    "examples": [
-                        "Write a story about AI friendship",
-                        "Create an article about technology trends",
-                        "Generate creative content about robots"
-                    ]
-                }
-            },
-            "developer": {
-                "name": "Marwen Rabai",
-                "website": "https://marwen-rabai.netlify.app",
-                "description": "Next-Generation AI Platform Developer"
-            }
-        }), 200
+        return capabilities_response(request)
 
     return app
 
 
-def start_model_background(data_path: str | None = None):
+def start_model_background(data_path: str | None = None, cache_size: int = 4096,
+                           cache_ttl: float | None = 600.0, model_path: str | None = None):
+    if model_path:
+        # e.g. the artifact written by `main.py tune`
+        log_message(f"Loading model from {model_path}...")
+        m = AIModel.load(model_path)
+        m.result_cache = ResultCache(cache_size, cache_ttl)
+        log_message("Advanced AI model ready with multiple capabilities")
+        return m
     log_message("Starting advanced AI model training for serve mode...")
     ds = Dataset(data_path)
     df = ds.load_data()
     X, y = ds.preprocess_data(df)
-    m = AIModel()
+    m = AIModel(cache_size=cache_size, cache_ttl=cache_ttl)
     m.train_model(X, y)
     log_message("Advanced AI model ready with multiple capabilities")
     return m
 
 
-def run_server(host: str = "127.0.0.1", port: int = 5000, data_path: str | None = None):
-    # Train model in background thread and start Flask with it
+def run_server(host: str = "127.0.0.1", port: int = 5000, data_path: str | None = None,
+               cache_size: int = 4096, cache_ttl: float | None = 600.0,
+               max_body_bytes: int = DEFAULT_MAX_BODY_BYTES, max_concurrency: int | None = None,
+               job_workers: int = 2, job_queue: int = 64, job_ttl: float = 600.0,
+               admin_token: str | None = None, profile_every: int = 0, profile_dir: str | None = None,
+               rss_limit: int | None = None, max_requests: int = 0, memory_interval: float = 30.0,
+               tracemalloc_frames: int = 0, drain_timeout: float = DEFAULT_DRAIN_TIMEOUT,
+               worker_fd: int | None = None, model_path: str | None = None,
+               document_workers: int | None = None):
+    """Serve the app, either standalone or as a supervised worker.
+
+    With ``worker_fd`` (passed by ``Supervisor``) the worker serves on the
+    inherited socket, trains before accepting requests, and on hitting
+    ``rss_limit`` or ``max_requests`` stops accepting, waits up to
+    ``drain_timeout`` for in-flight requests and jobs, and exits with
+    ``RECYCLE_EXIT_CODE`` so the supervisor starts a fresh worker.
+    ``model_path`` loads a saved ``AIModel`` instead of training one.
+    """
     model_container = {}
+    server = None
 
+    def recycle(reason):
+        log_message(f"Recycling worker {os.getpid()}: {reason}")
+        if server is not None:
+            server.shutdown()
+
+    watchdog = MemoryWatchdog(rss_limit=rss_limit if worker_fd is not None else None,
+                              max_requests=max_requests if worker_fd is not None else 0,
+                              interval=memory_interval, tracemalloc_frames=tracemalloc_frames,
+                              on_recycle=recycle).start()
+    jobs = JobManager(workers=job_workers, max_queue=job_queue, ttl=job_ttl)
+
+    # Create app that will reference model_container dynamically
+    app = create_app(model_container, max_body_bytes=max_body_bytes,
+                     scheduler=FairScheduler(max_concurrency=max_concurrency),
+                     jobs=jobs,
+                     profiler=RequestProfiler(admin_token, profile_every, profile_dir),
+                     watchdog=watchdog, document_workers=document_workers)
+
+    if worker_fd is not None:
+        # a replacement worker only starts accepting once its model is ready
+        model_container["model"] = start_model_background(data_path, cache_size, cache_ttl, model_path)
+        server = make_server(host, port, app, threaded=True, fd=worker_fd)
+        log_message(f"Worker {os.getpid()} serving on http://{host}:{port}")
+        if watchdog.draining:
+            # over the limit before serving anything: a fresh worker won't do
+            # better, so say so (the supervisor backs off quick restarts)
+            log_message(f"Worker {os.getpid()} exceeds its recycle limit right after startup "
+                        f"({watchdog.recycle_reason}); consider raising --max-rss-mb")
+        else:
+            server.serve_forever()
+        if not watchdog.wait_idle(drain_timeout) or not jobs.wait_idle(drain_timeout):
+            log_message(f"Worker {os.getpid()} drain timed out; exiting with work in flight")
+        sys.exit(RECYCLE_EXIT_CODE)
+
+    # Train model in background thread and start Flask with it
     def trainer():
-        model_container["model"] = start_model_background(data_path)
+        model_container["model"] = start_model_background(data_path, cache_size, cache_ttl, model_path)
 
     t = threading.Thread(target=trainer, daemon=True)
     t.start()
-
-    # Create app that will reference model_container dynamically
-    app = create_app(model_container)
     
     log_message(f"Starting Manus AI server on http://{host}:{port}")
     log_message("Advanced capabilities enabled: Image Generation, PDF Creation, Text Analysis, Content Creation")
@@ -207,5 +625,48 @@ if __name__ == "__main__":
     parser.add_argument("--host", default="127.0.0.1", help="Host to bind the server to")
     parser.add_argument("--port", type=int, default=5000, help="Port to bind the server to")
     parser.add_argument("--data", dest="data_path", default=None, help="Path to custom dataset")
+    parser.add_argument("--model", dest="model_path", default=None,
+                        help="Serve a saved model (e.g. from `main.py tune`) instead of training")
+    parser.add_argument("--cache-size", type=int, default=4096, help="Max memoized text-analysis results (0 disables)")
+    parser.add_argument("--cache-ttl", type=float, default=600.0, help="Seconds a memoized result stays valid")
+    parser.add_argument("--max-body-mb", type=int, default=DEFAULT_MAX_BODY_BYTES // (1024 * 1024),
+                        help="Largest accepted request body in MiB")
+    parser.add_argument("--max-concurrency", type=int, default=None,
+                        help="Requests executed at once across all capabilities (default: CPU count)")
+    parser.add_argument("--job-workers", type=int, default=2, help="Worker threads for /jobs")
+    parser.add_argument("--job-queue", type=int, default=64, help="Max pending jobs before /jobs returns 429")
+    parser.add_argument("--job-ttl", type=float, default=600.0, help="Seconds finished job results are kept")
+    parser.add_argument("--admin-token", default=os.environ.get("MANUS_ADMIN_TOKEN"),
+                        help="Token for admin endpoints and on-demand profiling (default: $MANUS_ADMIN_TOKEN)")
+    parser.add_argument("--profile-every", type=int, default=0, help="Profile every N-th /predict request (0 disables)")
+    parser.add_argument("--profile-dir", default=None, help="Directory for request profiles")
+    parser.add_argument("--document-workers", type=int, default=None,
+                        help="Processes scoring /analyze/document segments (default: CPU count)")
+    parser.add_argument("--workers", type=int, default=1,
+                        help="Supervised worker processes sharing the port (more than 1 implies supervision)")
+    parser.add_argument("--max-rss-mb", type=int, default=0,
+                        help="Recycle a worker whose resident memory exceeds this many MiB (0 disables)")
+    parser.add_argument("--max-requests", type=int, default=0,
+                        help="Recycle a worker after serving this many requests (0 disables)")
+    parser.add_argument("--memory-interval", type=float, default=30.0, help="Seconds between memory samples")
+    parser.add_argument("--tracemalloc-frames", type=int, default=0,
+                        help="Trace allocations with this many frames for /admin/memory (0 disables)")
+    parser.add_argument("--drain-timeout", type=float, default=DEFAULT_DRAIN_TIMEOUT,
+                        help="Seconds a recycling worker waits for in-flight requests and jobs")
+    parser.add_argument(WORKER_FD_FLAG, dest="worker_fd", type=int, default=None, help=argparse.SUPPRESS)
     args = parser.parse_args()
-    run_server(host=args.host, port=args.port, data_path=args.data_path)
+    if args.worker_fd is None and (args.workers > 1 or args.max_rss_mb > 0 or args.max_requests > 0):
+        # Recycling needs someone to start the replacement: run as supervisor
+        command = [sys.executable, os.path.abspath(__file__)] + sys.argv[1:]
+        log_message(f"Supervising {args.workers} worker(s) on http://{args.host}:{args.port}")
+        Supervisor(command, args.host, args.port, args.workers, log=log_message).run()
+        sys.exit(0)
+    run_server(host=args.host, port=args.port, data_path=args.data_path,
+               cache_size=args.cache_size, cache_ttl=args.cache_ttl,
+               max_body_bytes=args.max_body_mb * 1024 * 1024, max_concurrency=args.max_concurrency,
+               job_workers=args.job_workers, job_queue=args.job_queue, job_ttl=args.job_ttl,
+               admin_token=args.admin_token, profile_every=args.profile_every, profile_dir=args.profile_dir,
+               rss_limit=args.max_rss_mb * 1024 * 1024, max_requests=args.max_requests,
+               memory_interval=args.memory_interval, tracemalloc_frames=args.tracemalloc_frames,
+               drain_timeout=args.drain_timeout, worker_fd=args.worker_fd, model_path=args.model_path,
+               document_workers=args.document_workers)
@@ -1,6 +1,6 @@
-def log_message(message: str) -> None:
-    """Logs a message to the console."""
-    print(f"[LOG] {message}")
+def log_message(message: str, file=None) -> None:
+    """Logs a message to the console (or ``file``, e.g. ``sys.stderr``)."""
+    print(f"[LOG] {message}", file=file)
 
 def save_results(results: dict, filename: str) -> None:
     """Saves the results to a specified file."""
@@ -0,0 +1,66 @@
+import io
+import json
+import os
+import sys
+
+import numpy as np
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from src.ai.bulk import read_csv, read_jsonl, score_stream
+from src.ai.model import AIModel
+
+
+def _model():
+    X = np.random.RandomState(0).randn(50, 3)
+    y = (X[:, 0] > 0).astype(int)
+    model = AIModel()
+    model.train_model(X, y)
+    return model, X
+
+
+def test_jsonl_results_keep_input_order_across_workers():
+    model, X = _model()
+    lines = [json.dumps({"id": i, "features": row.tolist()}) for i, row in enumerate(X)]
+    lines.insert(3, json.dumps({"id": "t", "input": "analyze sentiment: great"}))
+    out = io.StringIO()
+    stats = score_stream(model, read_jsonl(io.StringIO("\n".join(lines)), chunk_size=7), out, workers=2)
+    rows = [json.loads(line) for line in out.getvalue().splitlines()]
+
+    assert stats["records"] == len(lines)
+    assert [r["index"] for r in rows] == list(range(len(lines)))
+    assert rows[3]["id"] == "t" and rows[3]["result"]["type"] == "sentiment"
+    numeric = [r["prediction"] for r in rows if "prediction" in r]
+    assert numeric == model.predict(X).tolist()
+
+
+def test_csv_input_and_output():
+    model, X = _model()
+    src = io.StringIO("id,a,b,c\n" + "\n".join(f"{i},{r[0]},{r[1]},{r[2]}" for i, r in enumerate(X[:5])))
+    out = io.StringIO()
+    score_stream(model, read_csv(src, chunk_size=2), out, fmt="csv")
+    lines = out.getvalue().splitlines()
+    assert lines[0] == "index,id,prediction,type,error"
+    assert len(lines) == 6
+
+
+def test_bad_jsonl_lines_become_error_records():
+    model, X = _model()
+    lines = [json.dumps(X[0].tolist()), "{not json", json.dumps({"id": 7}), json.dumps(X[1].tolist())]
+    out = io.StringIO()
+    stats = score_stream(model, read_jsonl(io.StringIO("\n".join(lines)), chunk_size=2), out)
+    rows = [json.loads(line) for line in out.getvalue().splitlines()]
+
+    assert stats["records"] == 4
+    assert rows[1]["line"] == 2 and "error" in rows[1]
+    assert rows[2]["line"] == 3 and "unrecognized record" in rows[2]["error"]
+    assert [rows[0]["prediction"], rows[3]["prediction"]] == model.predict(X[:2]).tolist()
+
+
+def test_text_records_are_scored_for_sentiment_not_routed():
+    model, _ = _model()
+    lines = [json.dumps("great product, would make again"), json.dumps("the report was bad")]
+    out = io.StringIO()
+    score_stream(model, read_jsonl(io.StringIO("\n".join(lines))), out)
+    rows = [json.loads(line) for line in out.getvalue().splitlines()]
+    assert [r["result"]["type"] for r in rows] == ["sentiment", "sentiment"]
+    assert rows[1]["result"]["sentiment_score"] < 0
@@ -0,0 +1,94 @@
+import os
+import sys
+import numpy as np
+import pandas as pd
+import scipy.sparse as sp
+
+# Ensure project's src/ is on sys.path for tests
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from src.ai.features import FeaturePipeline, infer_schema
+from src.ai.model import AIModel
+
+
+def _mixed_frame(n=200, seed=0):
+    rng = np.random.RandomState(seed)
+    y = rng.randint(0, 2, n)
+    words = np.array(["great excellent love wonderful", "bad awful hate terrible"])
+    return pd.DataFrame({
+        "amount": rng.randn(n) + y,
+        "city": rng.choice(["paris", "rome", "oslo"], n),
+        "review": [f"{words[t]} product number {i}" for i, t in enumerate(y)],
+    }), y
+
+
+def test_schema_inference_and_sparse_matrix():
+    X, _ = _mixed_frame()
+    schema = infer_schema(X)
+    assert schema.numeric == ("amount",)
+    assert schema.categorical == ("city",)
+    assert schema.text == ("review",)
+
+    features = FeaturePipeline(dtype=np.float32).fit(X)
+    matrix = features.transform(X)
+    assert sp.isspmatrix_csr(matrix) and matrix.dtype == np.float32
+    assert matrix.shape == (len(X), features.n_features_out_)
+    # unseen categories are ignored instead of raising
+    unseen = X.head(2).assign(city="lima")
+    assert features.transform(unseen).shape[1] == matrix.shape[1]
+
+
+def test_mixed_frame_trains_and_scores_with_both_engines():
+    X, y = _mixed_frame()
+    for engine in ("batch", "sgd"):
+        model = AIModel()
+        model.train_model(X, y, engine=engine)
+        assert model.features is not None
+        assert (model.predict(X) == y).mean() > 0.9
+        # free-text prompts go through the same feature build
+        assert model.predict("analyze this great excellent product")["type"] == "sentiment"
+
+
+def test_warm_retrain_leaves_the_serving_pipeline_untouched():
+    X, y = _mixed_frame()
+    fresh = X.assign(review=np.where(y == 1, "zebra zebra stripes", "apple apple orchard"))
+    for engine in ("batch", "sgd"):
+        model = AIModel()
+        model.train_model(X, y, engine=engine)
+        serving = model.model
+        before = serving.predict(X)
+        vocabulary = dict(serving.named_steps["features"].vectorizers_["review"].vocabulary_)
+
+        model.train_model(fresh, y, engine=engine, warm_start=True)
+        assert model.model is not serving
+        assert serving.named_steps["features"].vectorizers_["review"].vocabulary_ == vocabulary
+        assert (serving.predict(X) == before).all()
+        assert (model.predict(fresh) == y).mean() > 0.9
+
+
+def test_warm_sgd_retrain_on_the_same_vocabulary_continues_on_a_copy():
+    X, y = _mixed_frame()
+    model = AIModel()
+    model.train_model(X, y, engine="sgd")
+    serving = model.model
+    clf = serving.named_steps["sgdclassifier"]
+    coef = clf.coef_.copy()
+
+    model.train_model(X, y, engine="sgd", warm_start=True)
+    retrained = model.model.named_steps["sgdclassifier"]
+    assert retrained is not clf and retrained.t_ > clf.t_  # continued, not restarted
+    assert (clf.coef_ == coef).all()
+    assert model.model.named_steps["features"] is not serving.named_steps["features"]
+
+    # numeric rows can't continue from a mixed-frame model: start cold
+    numeric = np.random.RandomState(0).randn(len(y), 4)
+    model.train_model(numeric, y, engine="sgd", warm_start=True)
+    assert "standardscaler" in model.model.named_steps
+
+
+def test_warm_retrain_applies_new_feature_params():
+    X, y = _mixed_frame()
+    model = AIModel()
+    model.train_model(X, y)
+    model.train_model(X, y, warm_start=True, feature_params={"max_text_features": 3})
+    assert model.features.max_text_features == 3
+    assert len(model.features.vectorizers_["review"].vocabulary_) == 3
@@ -0,0 +1,35 @@
+import os
+import sys
+import threading
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from src.api.jobs import CANCELLED, SUCCEEDED, JobManager, JobQueueFull
+
+
+def test_queue_bound_and_cancellation():
+    release = threading.Event()
+    jobs = JobManager(workers=1, max_queue=1)
+    assert not jobs._threads  # started by the first submit
+    running = jobs.submit(release.wait)
+    while running.status != "running":
+        running.wait(0.001)
+    queued = jobs.submit(lambda: "never")
+    try:
+        jobs.submit(lambda: "overflow")
+        assert False, "Expected JobQueueFull"
+    except JobQueueFull:
+        pass
+
+    assert jobs.cancel(queued.id).status == CANCELLED
+    # the cancelled job no longer holds a queue slot
+    replacement = jobs.submit(lambda: "fits")
+    release.set()
+    assert running.wait(5) and running.status == SUCCEEDED
+    assert replacement.wait(5) and replacement.result == "fits"
+
+
+def test_finished_jobs_expire_after_ttl():
+    jobs = JobManager(workers=1, ttl=0)
+    job = jobs.submit(lambda: 42)
+    assert job.wait(5) and job.result == 42
+    assert jobs.get(job.id) is None
@@ -0,0 +1,56 @@
+import os
+import sys
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from src.ai.kernel import LinearKernel
+from src.ai.model import AIModel
+
+
+def _check_equivalent(pipeline, X):
+    kernel = LinearKernel.from_pipeline(pipeline)
+    np.testing.assert_allclose(kernel.predict_proba(X), pipeline.predict_proba(X), atol=1e-5)
+    assert (kernel.predict(X) == pipeline.predict(X)).mean() > 0.999
+    assert kernel.predict_row(X[0]) == pipeline.predict(X[:1])[0]
+
+
+def test_kernel_matches_sklearn_binary_and_multiclass(tmp_path):
+    rng = np.random.RandomState(0)
+    X = rng.randn(500, 8) * rng.uniform(0.1, 10, size=8) + rng.randn(8)
+    model = AIModel()
+    model.train_model(X, (X[:, 0] > X[:, 1]).astype(int))
+    _check_equivalent(model.model, X)
+
+    model.train_model(X, np.digitize(X[:, 2], [-1, 1]))
+    _check_equivalent(model.model, X)
+
+    model.train_model(X, np.digitize(X[:, 2], [-1, 1]), engine="sgd")
+    _check_equivalent(model.model, X)
+
+    path = str(tmp_path / "kernel.npz")
+    model.export_kernel(path)
+    np.testing.assert_array_equal(LinearKernel.load(path).predict(X), model.kernel.predict(X))
+
+
+def test_predict_row_pads_short_inputs():
+    X = np.random.RandomState(1).randn(100, 6)
+    model = AIModel()
+    model.train_model(X, (X[:, 0] > 0).astype(int))
+    padded = np.concatenate([X[0, :3], np.zeros(3)]).reshape(1, -1)
+    assert model.kernel.predict_row(X[0, :3]) == model.model.predict(padded)[0]
+
+
+def test_kernel_validates_like_sklearn_and_follows_multi_class():
+    X = np.random.RandomState(2).randn(150, 5)
+    model = AIModel()
+    model.train_model(X, np.digitize(X[:, 0], [-0.5, 0.5]))
+    for bad in (X[0], X[:, :4], np.full((1, 5), np.nan)):
+        with pytest.raises(ValueError):
+            model.predict(bad)
+    assert model.kernel.multi_class == "multinomial"
+
+    clf = model.model.named_steps["logisticregression"]
+    clf.multi_class = "ovr"  # as model_params can set it on older scikit-learn
+    assert LinearKernel.from_pipeline(model.model).multi_class == "ovr"
@@ -0,0 +1,46 @@
+import io
+import os
+import sys
+import numpy as np
+
+# Ensure project's src/ is on sys.path for tests
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from src.ai.context import RequestContext
+from src.ai.longdoc import iter_segments
+from src.ai.model import AIModel
+
+
+def _document(paragraphs=300, seed=0):
+    rng = np.random.RandomState(seed)
+    words = ["good", "great", "bad", "awful", "the", "café", "product", "service", "was", "really"]
+    return "\n\n".join(" ".join(rng.choice(words, rng.randint(5, 400))) for _ in range(paragraphs))
+
+
+def test_segments_are_bounded_and_map_back_to_the_document():
+    doc = _document()
+    stream = io.BytesIO(doc.encode("utf-8"))  # multi-byte chars straddle read chunks
+    segments = list(iter_segments(stream, segment_chars=500))
+    assert [s[0] for s in segments] == list(range(len(segments)))
+    for _, start, end, text in segments:
+        assert len(text) <= 500 and text == doc[start:end]
+    assert "".join(doc[s[1]:s[2]] for s in segments).split() == doc.split()
+
+
+def test_document_aggregate_matches_whole_text_and_parallel_scoring():
+    X = np.random.RandomState(0).randn(50, 10)
+    model = AIModel()
+    model.train_model(X, (X[:, 0] > 0).astype(int))
+    doc = _document()
+
+    serial = model.analyze_document(doc, segment_chars=1000, batch_size=8)
+    parallel = model.analyze_document(doc, segment_chars=1000, batch_size=8, workers=2)
+    assert serial == parallel
+    assert serial["segment_count"] == len(serial["segments"]) > 16
+    assert serial["sentiment_score"] == model._calculate_sentiment_score(RequestContext(doc))
+    assert serial["words"] == len(doc.split())
+
+    # long /predict inputs switch to document mode automatically, and are
+    # scheduled apart from short sentiment calls
+    assert model.route(doc) == "document_analysis"
+    assert model.route("analyze sentiment: good") == "text_analysis"
+    assert model.predict(doc)["mode"] == "document"
@@ -23,3 +23,87 @@ def test_predict_without_train():
         assert False, "Expected RuntimeError for predict without training"
     except RuntimeError:
         pass
+
+
+def test_sgd_engine_and_warm_start():
+    X = np.random.RandomState(0).randn(300, 10)
+    y = (X[:, 0] > 0).astype(int)
+    model = AIModel()
+    model.train_model(X, y, engine="sgd", chunk_size=64, dtype=np.float32)
+    assert "sgdclassifier" in model.model.named_steps
+    assert model.model.score(X, y) > 0.8
+
+    # continue training on appended rows without starting over, on a copy:
+    # the serving pipeline keeps its coefficients while the retrain runs
+    serving = model.model
+    clf = serving.named_steps["sgdclassifier"]
+    coef, mean = clf.coef_.copy(), serving.named_steps["standardscaler"].mean_.copy()
+    model.train_model(X[:100], y[:100], engine="sgd", warm_start=True)
+    retrained = model.model.named_steps["sgdclassifier"]
+    assert retrained is not clf and retrained.t_ > clf.t_
+    assert (clf.coef_ == coef).all()
+    assert (serving.named_steps["standardscaler"].mean_ == mean).all()
+
+    # a different column count starts cold instead of failing in the scaler
+    model.train_model(X[:, :7], y, engine="sgd", warm_start=True)
+    assert model.model.named_steps["sgdclassifier"].n_features_in_ == 7
+
+
+def test_batch_warm_start_reuses_coefficients():
+    X = np.random.RandomState(1).randn(200, 10)
+    y = (X[:, 0] > 0).astype(int)
+    model = AIModel()
+    model.train_model(X, y)
+    cold_iters = model.model.named_steps["logisticregression"].n_iter_[0]
+    model.train_model(np.vstack([X, X[:20]]), np.concatenate([y, y[:20]]), warm_start=True)
+    assert model.model.named_steps["logisticregression"].n_iter_[0] <= cold_iters
+
+
+def test_sentiment_results_are_memoized_per_model_version():
+    X = np.random.RandomState(0).randn(50, 10)
+    y = (X[:, 0] > 0).astype(int)
+    model = AIModel()
+    model.train_model(X, y)
+
+    first = model.predict("I love this great product")
+    again = model.predict("  i LOVE this   great product ")
+    assert again["text"] == "  i LOVE this   great product "
+    assert again["sentiment_score"] == first["sentiment_score"]
+    assert model.result_cache.stats()["hits"] == 1
+
+    model.train_model(X, y)
+    model.predict("I love this great product")
+    stats = model.result_cache.stats()
+    assert stats["hits"] == 1 and stats["size"] == 1
+
+
+def test_failed_image_generation_closes_its_figure(monkeypatch):
+    import matplotlib.pyplot as plt
+    X = np.random.RandomState(0).randn(50, 10)
+    model = AIModel()
+    model.train_model(X, (X[:, 0] > 0).astype(int))
+
+    def broken_savefig(self, *args, **kwargs):
+        raise OSError("disk full")
+    monkeypatch.setattr(plt.Figure, "savefig", broken_savefig)
+    before = len(plt.get_fignums())
+    assert model.predict("draw a picture of nature")["type"] == "error"
+    assert len(plt.get_fignums()) == before
+
+
+def test_request_context_is_shared_by_route_and_capability():
+    from src.ai.context import RequestContext
+    X = np.random.RandomState(0).randn(50, 10)
+    model = AIModel()
+    model.train_model(X, (X[:, 0] > 0).astype(int))
+
+    ctx = RequestContext("Write a STORY about artificial intelligence")
+    assert model.route(ctx) == "content_creation"
+    scanned = dict(ctx.matches)
+    assert scanned["write"] is True and "story" not in scanned
+    result = model.predict(ctx)
+    assert result["type"] == "content" and "Nova" in result["content"]
+    # the story stage reuses the routing matches and only adds its own keywords
+    assert {k: ctx.matches[k] for k in scanned} == scanned
+    assert ctx.matches["artificial intelligence"] is True
+    assert set(ctx.timings) == {"content_creation"}
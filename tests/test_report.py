@@ -0,0 +1,44 @@
+import io
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from src.ai.report import build_report, dataset_sections
+
+
+def test_dataset_report_embeds_one_chart_per_column():
+    df = pd.DataFrame(np.random.RandomState(0).randn(100, 3), columns=["a", "b & c", "d"])
+    df["target"] = (df["a"] > 0).astype(int)
+    buf = io.BytesIO()
+    info = build_report(dataset_sections(df), buf, workers=1)
+    assert info["charts"] == 4  # target distribution + three feature histograms
+    assert info["pages"] >= 1
+    assert buf.getvalue().startswith(b"%PDF")
+
+
+def test_sections_are_consumed_lazily():
+    pulled = []
+
+    def sections():
+        for i in range(200):
+            pulled.append(i)
+            yield {"heading": f"Section {i}", "paragraphs": ["text " * 50]}
+
+    progress = []
+    from reportlab.platypus import SimpleDocTemplate
+    original = SimpleDocTemplate.handle_pageBegin
+
+    def on_page(doc):
+        progress.append(len(pulled))
+        original(doc)
+
+    SimpleDocTemplate.handle_pageBegin = on_page
+    try:
+        build_report(sections(), io.BytesIO(), workers=1)
+    finally:
+        SimpleDocTemplate.handle_pageBegin = original
+    # the second page starts long before the generator is exhausted
+    assert progress[1] < 50
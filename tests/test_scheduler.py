@@ -0,0 +1,66 @@
+import os
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from src.api.scheduler import CapabilityPolicy, FairScheduler, Rejected
+
+
+def test_full_queue_is_rejected_with_429():
+    sched = FairScheduler({'pdf_creation': CapabilityPolicy(max_queue=1, deadline=5)}, max_concurrency=1)
+    held = sched.acquire('pdf_creation')
+    waiter = threading.Thread(target=lambda: sched.release(sched.acquire('pdf_creation')))
+    waiter.start()
+    while sched.stats()['capabilities']['pdf_creation']['queued'] == 0:
+        time.sleep(0.001)
+    try:
+        sched.acquire('pdf_creation')
+        assert False, "Expected Rejected for a full queue"
+    except Rejected as e:
+        assert e.status == 429 and e.retry_after >= 1
+    sched.release(held)
+    waiter.join()
+
+
+def test_capability_concurrency_cap_keeps_slots_for_cheap_work():
+    sched = FairScheduler({
+        'image_generation': CapabilityPolicy(max_concurrency=1, deadline=0.05),
+        'text_analysis': CapabilityPolicy(weight=8, deadline=0.05),
+    }, max_concurrency=2)
+    held = sched.acquire('image_generation')
+    try:
+        sched.acquire('image_generation')
+        assert False, "Expected the second image request to time out in the queue"
+    except Rejected as e:
+        assert e.status == 503
+    with sched.slot('text_analysis'):
+        pass
+    sched.release(held)
+    stats = sched.stats()['capabilities']
+    assert stats['image_generation']['expired'] == 1
+    assert stats['text_analysis']['admitted'] == 1
+
+
+def test_weighted_order_of_queued_requests():
+    sched = FairScheduler({
+        'pdf_creation': CapabilityPolicy(weight=1),
+        'text_analysis': CapabilityPolicy(weight=4),
+    }, max_concurrency=1)
+    held = sched.acquire('pdf_creation')
+    order = []
+
+    def run(cap):
+        with sched.slot(cap):
+            order.append(cap)
+
+    threads = []
+    for cap in ['pdf_creation'] * 2 + ['text_analysis'] * 2:
+        t = threading.Thread(target=run, args=(cap,))
+        t.start()
+        threads.append(t)
+        time.sleep(0.01)
+    sched.release(held)
+    for t in threads:
+        t.join()
+    assert order[:2] == ['text_analysis', 'text_analysis']
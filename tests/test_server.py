@@ -0,0 +1,197 @@
+import io
+import os
+import sys
+import numpy as np
+import pytest
+
+# server.py imports its siblings as top-level packages, so put src/ on sys.path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+from ai.model import AIModel
+from server import create_app
+
+
+def _client(**kwargs):
+    X = np.random.RandomState(0).randn(50, 10)
+    y = (X[:, 0] > 0).astype(int)
+    model = AIModel()
+    model.train_model(X, y)
+    return create_app({"model": model}, **kwargs).test_client()
+
+
+def _npy(arr):
+    buf = io.BytesIO()
+    np.save(buf, arr)
+    return buf.getvalue()
+
+
+def test_health_reports_result_cache():
+    client = _client()
+    client.post("/predict", json={"input": "analyze sentiment: good"})
+    client.post("/predict", json={"input": "Analyze  sentiment: GOOD"})
+    body = client.get("/health").get_json()
+    assert body["model_ready"] is True
+    assert body["result_cache"]["hits"] == 1
+
+
+def test_predict_accepts_npy_and_arrow_bodies():
+    client = _client()
+    X = np.random.RandomState(1).randn(20, 10)
+    expected = client.post("/predict", json={"features": X.tolist()}).get_json()["prediction"]
+
+    resp = client.post("/predict", data=_npy(X), content_type="application/x-npy")
+    assert resp.status_code == 200
+    assert resp.get_json()["prediction"] == expected
+
+    resp = client.post("/predict", data=_npy(X), content_type="application/x-npy",
+                       headers={"Accept": "application/x-npy"})
+    assert np.load(io.BytesIO(resp.data)).tolist() == expected
+
+    import pyarrow as pa
+    table = pa.table({f"f{i}": X[:, i] for i in range(X.shape[1])})
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_stream(sink, table.schema) as writer:
+        writer.write_table(table)
+    resp = client.post("/predict", data=sink.getvalue().to_pybytes(),
+                       content_type="application/vnd.apache.arrow.stream")
+    assert resp.get_json()["prediction"] == expected
+
+
+def test_predict_rejects_oversized_binary_body():
+    client = _client(max_body_bytes=1024)
+    resp = client.post("/predict", data=_npy(np.zeros((100, 10))), content_type="application/x-npy")
+    assert resp.status_code == 413
+
+
+def test_predict_response_shaping_and_encoding():
+    client = _client()
+    X = np.random.RandomState(2).randn(5, 10)
+
+    full = client.post("/predict", json={"features": X.tolist()}).get_json()
+    assert "features" in full
+
+    slim = client.post("/predict?echo=0", json={"features": X.tolist()}).get_json()
+    assert "features" not in slim and slim["prediction"] == full["prediction"]
+
+    only = client.post("/predict", json={"input": "analyze sentiment: good", "fields": "prediction"})
+    assert only.status_code == 200
+    assert list(only.get_json()) == ["prediction"]
+
+    msgpack = pytest.importorskip("msgpack")
+    resp = client.post("/predict?fields=prediction", json={"features": X.tolist()},
+                       headers={"Accept": "application/msgpack"})
+    assert resp.mimetype == "application/msgpack"
+    assert msgpack.unpackb(resp.data) == {"prediction": full["prediction"]}
+
+
+def test_large_text_responses_are_compressed():
+    import gzip
+    client = _client()
+    resp = client.post("/predict", json={"input": "write an article about technology"},
+                       headers={"Accept-Encoding": "gzip"})
+    assert resp.headers["Content-Encoding"] == "gzip"
+    assert b"Human-AI Collaboration" in gzip.decompress(resp.data)
+
+
+def test_rejected_requests_get_retry_after():
+    from api.scheduler import CapabilityPolicy, FairScheduler
+    sched = FairScheduler({'prediction': CapabilityPolicy(max_queue=0)}, max_concurrency=1)
+    client = _client(scheduler=sched)
+
+    resp = client.post("/predict", json={"features": np.zeros((2, 10)).tolist()})
+    assert resp.status_code == 429
+    assert int(resp.headers["Retry-After"]) >= 1
+    assert client.get("/metrics").get_json()["scheduler"]["capabilities"]["prediction"]["rejected_full"] == 1
+
+
+def test_pdf_job_lifecycle():
+    client = _client()
+    resp = client.post("/jobs", json={"input": "pdf report about business"})
+    assert resp.status_code == 202
+    job_id = resp.get_json()["job_id"]
+
+    body = client.get(f"/jobs/{job_id}?wait=30").get_json()
+    assert body["status"] == "succeeded"
+    assert "data" not in body["result"]
+    artifact = client.get(body["artifact_url"])
+    assert artifact.mimetype == "application/pdf"
+    assert artifact.data.startswith(b"%PDF")
+    # jobs are admitted through the same scheduler as /predict
+    scheduler = client.get("/metrics").get_json()["scheduler"]
+    assert scheduler["capabilities"]["pdf_creation"]["admitted"] == 1
+
+    assert client.get("/jobs/unknown").status_code == 404
+
+
+def test_on_demand_profiling_requires_admin_token(tmp_path):
+    from api.profiling import RequestProfiler
+    client = _client(profiler=RequestProfiler(admin_token="secret", directory=str(tmp_path)))
+
+    resp = client.post("/predict", json={"input": "hello"}, headers={"X-Profile": "1"})
+    assert "X-Profile-Id" not in resp.headers
+
+    resp = client.post("/predict", json={"input": "hello"},
+                       headers={"X-Profile": "1", "X-Admin-Token": "secret"})
+    name = resp.headers["X-Profile-Id"]
+
+    assert client.get("/admin/profiles").status_code == 403
+    listing = client.get("/admin/profiles", headers={"X-Admin-Token": "secret"}).get_json()
+    assert [p["name"] for p in listing["profiles"]] == [name]
+    # the token is only read from the header, never from the (logged) URL
+    assert client.get(f"/admin/profiles/{name}?admin_token=secret").status_code == 403
+    text = client.get(f"/admin/profiles/{name}?format=text",
+                      headers={"X-Admin-Token": "secret"}).get_data(as_text=True)
+    assert "_analyze_sentiment" in text
+
+
+def test_worker_drains_after_max_requests():
+    import tracemalloc
+    from api.memory import MemoryWatchdog
+    from api.profiling import RequestProfiler
+
+    reasons = []
+    watchdog = MemoryWatchdog(max_requests=3, tracemalloc_frames=1, on_recycle=reasons.append)
+    try:
+        client = _client(watchdog=watchdog, profiler=RequestProfiler(admin_token="secret"))
+        assert client.get("/health").status_code == 200
+        assert client.get("/admin/memory").status_code == 403
+        report = client.get("/admin/memory?limit=5", headers={"X-Admin-Token": "secret"}).get_json()
+        assert report["memory"]["rss"] > 0 and len(report["top_allocations"]) <= 5
+
+        health = client.get("/health")
+        assert health.status_code == 503 and health.get_json()["status"] == "draining"
+        assert watchdog.wait_idle(1.0)
+        assert "requests" in watchdog.recycle_reason
+    finally:
+        tracemalloc.stop()  # don't leave tracing on for later tests
+
+
+def test_document_sentiment_streams_plain_text_body():
+    client = _client(document_workers=1)
+    doc = "\n\n".join(["great product, really good"] * 50 + ["awful, bad service"] * 10)
+    body = client.post("/analyze/document?segment_chars=200&segments=0", data=doc.encode(),
+                       content_type="text/plain").get_json()
+    assert body["mode"] == "document" and "segments" not in body
+    assert body["segment_sentiments"]["Positive"] > body["segment_sentiments"].get("Negative", 0)
+    assert client.post("/analyze/document?segment_chars=5", data=b"x").status_code == 400
+
+
+def test_conditional_requests_get_304():
+    client = _client()
+    caps = client.get("/capabilities")
+    assert caps.headers["Cache-Control"].startswith("public")
+    assert client.get("/capabilities", headers={"If-None-Match": caps.headers["ETag"]}).status_code == 304
+    gzipped = client.get("/capabilities", headers={"Accept-Encoding": "gzip"})
+    assert gzipped.headers["Content-Encoding"] == "gzip"
+    assert gzipped.headers["ETag"] != caps.headers["ETag"]
+
+    health = client.get("/health")
+    assert health.headers["Cache-Control"] == "no-store" and "ETag" not in health.headers
+
+    # POST can't be answered with 304, so /predict results carry no validator
+    assert "ETag" not in client.post("/predict", json={"input": "analyze sentiment: great"}).headers
+    assert client.get("/predict?input=analyze sentiment: great").status_code == 405
+
+    job_id = client.post("/jobs", json={"input": "analyze sentiment: great"}).get_json()["job_id"]
+    done = client.get(f"/jobs/{job_id}?wait=30")
+    assert done.get_json()["status"] == "succeeded"
+    assert client.get(f"/jobs/{job_id}", headers={"If-None-Match": done.headers["ETag"]}).status_code == 304
@@ -0,0 +1,17 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from src.api.supervisor import (CRASH_BACKOFF_SECONDS, MAX_BACKOFF_SECONDS, MIN_UPTIME_SECONDS,
+                                RECYCLE_EXIT_CODE, Supervisor)
+
+
+def test_quick_recycles_back_off_until_a_worker_stays_up():
+    supervisor = Supervisor(["true"], "127.0.0.1", 0, log=lambda message: None)
+    delays = [supervisor.restart_delay(RECYCLE_EXIT_CODE, uptime=0.5) for _ in range(10)]
+    assert delays[:3] == [CRASH_BACKOFF_SECONDS, 2 * CRASH_BACKOFF_SECONDS, 4 * CRASH_BACKOFF_SECONDS]
+    assert delays[-1] == MAX_BACKOFF_SECONDS
+
+    # a worker that served for a while is replaced at once and resets the back-off
+    assert supervisor.restart_delay(RECYCLE_EXIT_CODE, uptime=MIN_UPTIME_SECONDS) == 0.0
+    assert supervisor.restart_delay(1, uptime=0.5) == CRASH_BACKOFF_SECONDS
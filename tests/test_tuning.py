@@ -0,0 +1,40 @@
+import os
+import sys
+import numpy as np
+import pandas as pd
+
+# Ensure project's src/ is on sys.path for tests
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from src.ai.model import AIModel
+from src.ai.tuning import tune
+
+
+def test_successive_halving_picks_a_persistable_winner(tmp_path):
+    rng = np.random.RandomState(0)
+    X = rng.randn(3000, 5)
+    y = (X[:, 0] - X[:, 1] > 0).astype(int)
+    grid = {"model": {"C": [0.001, 0.01, 0.1, 1.0, 10.0], "class_weight": [None, "balanced"]}}
+    model, report = tune(X, y, grid=grid, n_folds=2, eta=3, workers=1)
+
+    counts = [rung["candidates"] for rung in report["rungs"]]
+    assert counts[0] == 10 and counts == sorted(counts, reverse=True) and counts[-1] <= 3
+    assert report["rungs"][-1]["rows"] == 1500
+    finalists = [r for r in report["results"] if "latency_ms" in r]
+    assert report["winner"] in [r["id"] for r in finalists]
+
+    path = str(tmp_path / "model.pkl")
+    model.save(path)
+    loaded = AIModel.load(path)
+    assert (loaded.predict(X[:20]) == model.predict(X[:20])).all()
+
+
+def test_feature_grid_is_searched_for_mixed_frames():
+    rng = np.random.RandomState(1)
+    y = rng.randint(0, 2, 300)
+    X = pd.DataFrame({"x": rng.randn(300),
+                      "note": np.where(y == 1, "really good nice thing", "really bad poor thing")})
+    grid = {"model": {"C": [1.0]}, "features": {"max_text_features": [2, 50]}}
+    model, report = tune(X, y, grid=grid, n_folds=2, workers=1)
+    assert report["feature_configs"] == 2
+    assert model.features is not None
+    assert max(r["score"] for r in report["results"]) > 0.9